@@ -1,4 +1,7 @@
-from Types import ParameterException
+from Types import ParameterException, DefaultImportBatchSize, DefaultDownloadRetries
+from Types import ArrowFileExtensions, NumpyFileExtensions, NumpyDataTypes
+from Types import CompressionExtensions, ExportFileExtensions
+from time import perf_counter
 import os
 
 
@@ -84,6 +87,1428 @@ def handleCsvFile(result, csv_reader, withCol):
     click.echo(f"Processed {line_count} lines.")
 
 
+def readFileInBatches(
+    path="",
+    batchSize=DefaultImportBatchSize,
+    processes=1,
+    offset=0,
+    columns=None,
+    sidecar=None,
+    fields=None,
+):
+    """
+    Read a file to import in batches according to its extension, see
+    readCsvFileInBatches, readNumpyFileInBatches and readArrowFileInBatches.
+    Csv columns are decoded by the types of `fields` of the same names, see
+    PyOrm.getImportFields.
+    """
+    if os.path.splitext(path)[1] in NumpyFileExtensions:
+        return readNumpyFileInBatches(path, batchSize, sidecar, offset, fields)
+    if os.path.splitext(path)[1] in ArrowFileExtensions:
+        return readArrowFileInBatches(path, batchSize, offset)
+    if sidecar:
+        raise ParameterException("Sidecar files only work with .npy/.npz files.")
+    return readCsvFileInBatches(
+        path,
+        batchSize,
+        processes=processes,
+        offset=offset,
+        columns=columns,
+        fields=fields,
+    )
+
+
+def readCsvFileInBatches(
+    path="",
+    batchSize=DefaultImportBatchSize,
+    withCol=True,
+    processes=1,
+    offset=0,
+    columns=None,
+    fields=None,
+):
+    """
+    Read csv file(local or remote) as a stream and yield batches of at most
+    `batchSize` rows, the peak memory depends on the batch size instead of the
+    file size. Local files are parsed by `processes` worker processes if it is
+    greater than 1. Files ending with .gz/.bz2/.zst are decompressed as a
+    stream, they are parsed by a single process.
+
+    To resume an import, pass the byte `offset` of the first row to read and
+    the `columns` read from the header before. Columns named after `fields`
+    are decoded by their types, others are guessed.
+    """
+    import re
+    import click
+
+    if batchSize <= 0:
+        raise ParameterException("Batch size should be a positive integer.")
+    if processes <= 0:
+        raise ParameterException("Processes should be a positive integer.")
+    pattern = re.compile(".+\..+\/.*")
+    isUrl = pattern.match(path)
+    if isUrl:
+        if processes > 1:
+            click.echo("Remote files are parsed by a single process.")
+        return readCsvFileFromUrlInBatches(
+            path, batchSize, withCol, offset, columns, fields
+        )
+    if processes > 1 and getCompression(path):
+        click.echo("Compressed files are parsed by a single process.")
+    elif processes > 1:
+        return readCsvFileFromLocalInParallel(
+            path, batchSize, withCol, processes, offset, columns, fields
+        )
+    return readCsvFileFromLocalInBatches(
+        path, batchSize, withCol, offset, columns, fields
+    )
+
+
+def readCsvFileFromLocalInBatches(
+    path="",
+    batchSize=DefaultImportBatchSize,
+    withCol=True,
+    offset=0,
+    columns=None,
+    fields=None,
+):
+    import click
+
+    click.echo("Reading file from local path.")
+    compression = getCompression(path)
+    if not path or not path[: len(path) - len(compression)][-4:] == ".csv":
+        raise ParameterException(
+            "Path is empty or target file is not .csv(.gz, .bz2, .zst)"
+        )
+    try:
+        fileSize = os.stat(path).st_size
+    except FileNotFoundError as fe:
+        raise ParameterException(f"FileNotFoundError {str(fe)}")
+    click.echo(f"Opening csv file({fileSize} bytes)...")
+    with openLocalFile(path, compression, offset) as csv_file:
+        yield from handleCsvFileInBatches(
+            csv_file, batchSize, withCol, columns, offset, fields=fields
+        )
+
+
+def readCsvFileFromLocalInParallel(
+    path="",
+    batchSize=DefaultImportBatchSize,
+    withCol=True,
+    processes=2,
+    offset=0,
+    columns=None,
+    fields=None,
+):
+    """
+    Split a local csv file into byte ranges aligned to line boundaries, each
+    range holds about `batchSize` rows. Ranges are parsed by a process pool
+    and yielded in file order, at most `2 * processes` ranges are in flight.
+    Quoted values must not contain line breaks.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from collections import deque
+    import click
+
+    click.echo("Reading file from local path.")
+    if not path or not path[-4:] == ".csv":
+        raise ParameterException("Path is empty or target file is not .csv")
+    try:
+        fileSize = os.stat(path).st_size
+    except FileNotFoundError as fe:
+        raise ParameterException(f"FileNotFoundError {str(fe)}")
+    click.echo(f"Opening csv file({fileSize} bytes) with {processes} processes...")
+    headerColumns, begin, rowSize = readCsvFileHeader(path, withCol)
+    if columns is None:
+        columns = headerColumns
+    begin = offset or begin
+    if withCol:
+        click.echo(f"""Column names are {columns}""")
+    ranges = splitCsvFileByteRanges(path, begin, max(rowSize * batchSize, 1))
+    rowCount = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for seq, (begin, end) in enumerate(ranges):
+            future = executor.submit(
+                parseCsvByteRange, path, begin, end, columns, fields
+            )
+            pending.append((seq, begin, end, future))
+            if len(pending) < 2 * processes:
+                continue
+            rowCount += yield from _yieldParsedRange(columns, *pending.popleft())
+        while pending:
+            rowCount += yield from _yieldParsedRange(columns, *pending.popleft())
+    click.echo(f"Processed {rowCount + (1 if withCol and not offset else 0)} lines.")
+
+
+def _yieldParsedRange(columns, seq, begin, end, future):
+    data, rows, timings = future.result()
+    if rows:
+        yield _makeBatch(seq, columns, data, rows, begin, end, timings=timings)
+    return rows
+
+
+def readCsvFileHeader(path, withCol=True, sampleLines=100):
+    """
+    Return the column names, the byte offset where rows begin and the average
+    size in bytes of the first `sampleLines` rows.
+    """
+    from csv import reader
+
+    with open(path, "rb") as csv_file:
+        header = csv_file.readline() if withCol else b""
+        columns = next(reader([header.decode("utf-8")]), []) if withCol else []
+        sample = [csv_file.readline() for _ in range(sampleLines)]
+    sampleSize = sum(map(len, sample))
+    sampleCount = len(list(filter(None, sample)))
+    rowSize = sampleSize // sampleCount if sampleCount else 1
+    return columns, len(header), rowSize
+
+
+def splitCsvFileByteRanges(path, begin=0, chunkSize=64 << 20):
+    """
+    Split [begin, EOF) of a file into ranges of about `chunkSize` bytes, every
+    range ends right after a line break (or at EOF).
+    """
+    fileSize = os.stat(path).st_size
+    ranges = []
+    with open(path, "rb") as f:
+        while begin < fileSize:
+            f.seek(min(begin + chunkSize, fileSize))
+            f.readline()
+            end = min(f.tell(), fileSize)
+            ranges.append((begin, end))
+            begin = end
+    return ranges
+
+
+# Runs in worker processes of readCsvFileFromLocalInParallel.
+def parseCsvByteRange(path, begin, end, columns=None, fields=None):
+    from csv import reader
+    from json import JSONDecodeError
+
+    clock = _startClock()
+    with open(path, "rb") as csv_file:
+        csv_file.seek(begin)
+        chunk = csv_file.read(end - begin)
+    clock["read"] = perf_counter() - clock["start"]
+    try:
+        rows = list(filter(None, reader(chunk.decode("utf-8").splitlines())))
+        convertStart = perf_counter()
+        data = formatColumnsForData(rows, columns, fields) if rows else []
+        return (data, len(rows), _stopClock(clock, convertStart))
+    except UnicodeDecodeError as ue:
+        raise ParameterException(f"UnicodeDecodeError {str(ue)}")
+    except JSONDecodeError as je:
+        raise ParameterException(f"JSONDecodeError {str(je)}")
+
+
+def readCsvFileFromUrlInBatches(
+    url="",
+    batchSize=DefaultImportBatchSize,
+    withCol=True,
+    offset=0,
+    columns=None,
+    fields=None,
+):
+    from urllib.parse import urlparse
+    import click
+
+    click.echo("Reading file from remote URL.")
+    decompressor = getDecompressor(getCompression(urlparse(url).path))
+    yield from handleCsvFileInBatches(
+        readUrlLines(url, offset, decompressor=decompressor),
+        batchSize,
+        withCol,
+        columns,
+        offset,
+        fields=fields,
+    )
+
+
+def readUrlLines(
+    url="",
+    offset=0,
+    chunkSize=1 << 20,
+    retries=DefaultDownloadRetries,
+    decompressor=None,
+):
+    """
+    Stream a remote file line by line from byte `offset`. If the connection
+    drops, the download goes on from the last received byte with a HTTP Range
+    request, up to `retries` times in a row. If the server ignores Range, the
+    download starts over and skips the bytes received before.
+
+    With a `decompressor`, chunks are decompressed as they arrive and `offset`
+    is a position in the decompressed stream, so the download starts over and
+    skips `offset` decompressed bytes.
+    """
+    import requests
+    from io import BytesIO
+    from time import sleep
+    import click
+
+    received, skip = (0, offset) if decompressor else (offset, 0)
+    pending, attempt, discard = b"", 0, 0
+    with requests.Session() as s:
+        while True:
+            headers = {"Accept-Encoding": "identity"}
+            if received:
+                headers["Range"] = f"bytes={received}-"
+            try:
+                with s.get(url, headers=headers, stream=True) as download:
+                    download.raise_for_status()
+                    if received and download.status_code != 206:
+                        click.echo(
+                            f"Server doesn't support Range, skipping {received} bytes from the start..."
+                        )
+                        discard, received = discard + received, 0
+                    length = download.headers.get("Content-Length")
+                    end = received + int(length) if length else None
+                    for chunk in download.iter_content(chunk_size=chunkSize):
+                        received += len(chunk)
+                        attempt = 0
+                        if discard:
+                            dropped = min(discard, len(chunk))
+                            chunk, discard = chunk[dropped:], discard - dropped
+                        if decompressor:
+                            chunk = decompressor.decompress(chunk)
+                        if skip:
+                            chunk, skip = chunk[skip:], max(skip - len(chunk), 0)
+                        lines, sep, pending = (pending + chunk).rpartition(b"\n")
+                        if sep:
+                            yield from BytesIO(lines + sep)
+                    if end and received < end:
+                        raise requests.exceptions.ChunkedEncodingError(
+                            f"Connection closed at {received}/{end} bytes."
+                        )
+                break
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as e:
+                attempt += 1
+                if attempt > retries:
+                    raise ParameterException(f"Download error! {str(e)}")
+                click.echo(f"Download dropped at {received} bytes, resuming...")
+                sleep(attempt)
+            except requests.HTTPError as he:
+                raise ParameterException(f"Download error! {str(he)}")
+    if decompressor and hasattr(decompressor, "flush"):
+        pending += decompressor.flush()
+    if pending:
+        yield from BytesIO(pending)
+
+
+def getCompression(path):
+    "Return the compression extension(.gz, .bz2, .zst) of a path or ''."
+    for extension in CompressionExtensions:
+        if path.endswith(extension):
+            return extension
+    return ""
+
+
+def openLocalFile(path, compression="", offset=0):
+    """
+    Open a local file for reading bytes from `offset`, decompressing it as a
+    stream. Compressed files seek forward by reading.
+    """
+    import gzip
+    import bz2
+    from io import BufferedReader
+
+    if compression == ".zst":
+        zstd = importZstandard()
+        reader = zstd.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True
+        )
+        reader.seek(offset)
+        return BufferedReader(reader)
+    if compression == ".gz":
+        file = gzip.open(path, "rb")
+    elif compression == ".bz2":
+        file = bz2.open(path, "rb")
+    else:
+        file = open(path, "rb")
+    file.seek(offset)
+    return file
+
+
+def getDecompressor(compression=""):
+    """
+    Return an incremental decompressor with a decompress method or None. Files
+    of several gzip members, bz2 streams or zstd frames(written by pigz,
+    bgzip, pbzip2 or concatenated) are decompressed to their end.
+    """
+    import zlib
+    import bz2
+
+    if compression == ".gz":
+        return MultiStreamDecompressor(
+            lambda: zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        )
+    if compression == ".bz2":
+        return MultiStreamDecompressor(bz2.BZ2Decompressor)
+    if compression == ".zst":
+        zstd = importZstandard()
+        return zstd.ZstdDecompressor().decompressobj(read_across_frames=True)
+    return None
+
+
+class MultiStreamDecompressor(object):
+    """
+    Decompress concatenated streams, a zlib or bz2 decompressor stops at the
+    end of the first one. A new decompressor from `factory` goes on with the
+    data left over.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.decompressor = factory()
+
+    def decompress(self, data):
+        output = []
+        while data:
+            if self.decompressor.eof:
+                self.decompressor = self.factory()
+            output.append(self.decompressor.decompress(data))
+            data = self.decompressor.unused_data if self.decompressor.eof else b""
+        return b"".join(output)
+
+    def flush(self):
+        if hasattr(self.decompressor, "flush"):
+            return self.decompressor.flush()
+        return b""
+
+
+def importZstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ParameterException(
+            ".zst files need zstandard, please run `pip install zstandard`."
+        )
+    return zstandard
+
+
+def handleCsvFileInBatches(
+    lines, batchSize, withCol, columns=None, offset=0, verbose=True, fields=None
+):
+    """
+    Parse csv rows from an iterable of encoded lines starting at byte `offset`
+    of the file and yield a dict for every `batchSize` rows:
+
+        {"seq": 0, "columns": [...], "data": [[...], ...], "rows": 10000, "begin": 20, "offset": 1024}
+
+    "begin" and "offset" are the byte offsets of the first row of the batch
+    and of the end of its last row. The header is not read if `columns` is
+    given. Nothing is printed unless `verbose`. See formatColumnsForData for
+    `fields`. Every batch also records the seconds spent reading lines,
+    parsing rows and converting columns in "timings", see _stopClock.
+    """
+    from csv import reader
+    from json import JSONDecodeError
+    import click
+
+    unit = "bytes" if verbose else None
+    progress = {"offset": offset}
+    clock = _startClock()
+    lines = _timedIterator(lines, clock)
+    csv_reader = reader(_decodeCsvLines(lines, progress), delimiter=",")
+    rows, seq, lineCount = [], 0, 0
+    try:
+        if columns is None:
+            columns = next(csv_reader, []) if withCol else []
+            lineCount += 1 if withCol else 0
+        if withCol and verbose:
+            click.echo(f"""Column names are {columns}""")
+        begin = progress["offset"]
+        for row in csv_reader:
+            lineCount += 1
+            if not row:
+                continue
+            rows.append(row)
+            if len(rows) == batchSize:
+                convertStart = perf_counter()
+                data = formatColumnsForData(rows, columns, fields)
+                timings = _stopClock(clock, convertStart)
+                end = progress["offset"]
+                yield _makeBatch(
+                    seq, columns, data, len(rows), begin, end, unit, timings
+                )
+                _startClock(clock)
+                rows, seq, begin = [], seq + 1, end
+        if rows:
+            convertStart = perf_counter()
+            data = formatColumnsForData(rows, columns, fields)
+            timings = _stopClock(clock, convertStart)
+            end = progress["offset"]
+            yield _makeBatch(seq, columns, data, len(rows), begin, end, unit, timings)
+    except UnicodeDecodeError as ue:
+        raise ParameterException(f"UnicodeDecodeError {str(ue)}")
+    except JSONDecodeError as je:
+        raise ParameterException(f"JSONDecodeError {str(je)}")
+    if verbose:
+        click.echo(f"Processed {lineCount} lines.")
+
+
+def _decodeCsvLines(lines, progress):
+    for line in lines:
+        progress["offset"] += len(line)
+        yield line.decode("utf-8")
+
+
+# Print a line about the batch unless `unit` of offsets is None, "id" names
+# the batch and its offsets in messages.
+def _makeBatch(seq, columns, data, rows, begin, offset, unit="bytes", timings=None):
+    import click
+
+    if unit:
+        click.echo(f"Batch {seq}: {rows} rows read, {offset} {unit} consumed.")
+    return {
+        "id": f"{seq}({begin}-{offset})",
+        "seq": seq,
+        "columns": columns,
+        "data": data,
+        "rows": rows,
+        "begin": begin,
+        "offset": offset,
+        "timings": timings or {},
+    }
+
+
+# Start timing the next batch, the seconds spent in _timedIterator are "read".
+def _startClock(clock=None):
+    clock = {} if clock is None else clock
+    clock.update(start=perf_counter(), read=0.0)
+    return clock
+
+
+def _stopClock(clock, convertStart):
+    """
+    Return the timings of a batch converted since `convertStart`: seconds
+    spent reading, parsing(anything else before converting) and converting.
+    """
+    now = perf_counter()
+    return {
+        "read": clock["read"],
+        "parse": max(convertStart - clock["start"] - clock["read"], 0.0),
+        "convert": now - convertStart,
+    }
+
+
+def _timedIterator(iterable, clock):
+    iterator = iter(iterable)
+    while True:
+        startTime = perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            clock["read"] += perf_counter() - startTime
+        yield item
+
+
+def readNumpyFileInBatches(
+    path="", batchSize=DefaultImportBatchSize, sidecar=None, offset=0, fields=None
+):
+    """
+    Slice arrays of a local .npy/.npz file into batches without copying them.
+    A .npy file holds a single column, the column of the only vector field of
+    `fields` if it is a vector array, otherwise named after the file. Every
+    array of a .npz file is a column named after its key. The
+    .fvecs/.ivecs/.bvecs files of ANN benchmarks are read like a .npy file,
+    see loadVecsArray. 2-D float arrays are float vectors, 2-D uint8 arrays
+    are binary vectors and 1-D arrays are scalars. Scalar columns can be read
+    from a csv `sidecar` file with headers, its columns follow the array
+    columns. "begin" and "offset" of the batches are row numbers.
+    """
+    import click
+
+    click.echo("Reading file from local path.")
+    if not path or not os.path.isfile(path):
+        raise ParameterException(f"No such file {path}")
+    arrays = loadNumpyArrays(path)
+    if os.path.splitext(path)[1] != ".npz":
+        arrays = nameLoneArray(arrays, fields)
+    rowCounts = set(map(len, arrays.values()))
+    if len(rowCounts) != 1:
+        raise ParameterException("Arrays should have the same number of rows.")
+    rowCount = rowCounts.pop()
+    columns = list(arrays.keys())
+    click.echo(f"Opening {path}({rowCount} rows), column names are {columns}")
+    sidecarBatches = sidecar and readSidecarFileInBatches(
+        sidecar, batchSize, offset, fields
+    )
+    clock = _startClock()
+    for seq, begin in enumerate(range(offset, rowCount, batchSize)):
+        end = min(begin + batchSize, rowCount)
+        # Slices of memory-mapped arrays are read while being converted.
+        convertStart = perf_counter()
+        data = [formatArrayForData(array[begin:end]) for array in arrays.values()]
+        timings = _stopClock(clock, convertStart)
+        batchColumns = columns
+        if sidecarBatches:
+            sidecarBatch = next(sidecarBatches, None)
+            if not sidecarBatch or sidecarBatch["rows"] != end - begin:
+                raise ParameterException("Sidecar file has less rows than arrays.")
+            batchColumns = columns + sidecarBatch["columns"]
+            data += sidecarBatch["data"]
+            for stage, seconds in sidecarBatch["timings"].items():
+                timings[stage] += seconds
+        yield _makeBatch(
+            seq, batchColumns, data, end - begin, begin, end, "rows", timings
+        )
+        _startClock(clock)
+    click.echo(f"Processed {rowCount - offset} rows.")
+
+
+def readSidecarFileInBatches(path, batchSize, offset=0, fields=None):
+    "Read the csv sidecar of a numpy file in batches from row `offset`."
+    from csv import reader
+
+    if not os.path.isfile(path):
+        raise ParameterException(f"No such sidecar file {path}")
+    with open(path, "rb") as sidecar_file:
+        columns = next(reader([sidecar_file.readline().decode("utf-8")]), [])
+        for _ in range(offset):
+            sidecar_file.readline()
+        yield from handleCsvFileInBatches(
+            sidecar_file, batchSize, True, columns, verbose=False, fields=fields
+        )
+
+
+def loadNumpyArrays(path):
+    """
+    Return {column name: array} of a .npy/.npz/.fvecs/.ivecs/.bvecs file.
+    All of them are memory-mapped except compressed members of .npz files.
+    """
+    import numpy as np
+    import zipfile
+
+    name, extension = os.path.splitext(os.path.basename(path))
+    if extension == ".npy":
+        return {name: np.load(path, mmap_mode="r")}
+    if extension in [".fvecs", ".ivecs", ".bvecs"]:
+        return {name: loadVecsArray(path)}
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename[-4:] == ".npy" else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = mmapNpzMember(path, info)
+            else:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+    return arrays
+
+
+def nameLoneArray(arrays, fields=None):
+    """
+    Name the single array of a .npy/.fvecs/.ivecs/.bvecs file after the only
+    vector field of `fields` if it is 2-D, so files written by
+    NpyExportWriter are imported whatever they are named.
+    """
+    [(name, array)] = arrays.items()
+    vectorNames = [
+        field["name"]
+        for field in fields or []
+        if field["type"] in ["FLOAT_VECTOR", "BINARY_VECTOR"] and not field["autoId"]
+    ]
+    if array.ndim == 2 and len(vectorNames) == 1:
+        name = vectorNames[0]
+    return {name: array}
+
+
+def loadVecsArray(path):
+    """
+    Memory-map a .fvecs/.ivecs/.bvecs file as a 2-D array. Every vector of
+    these files is an int32 dim followed by dim float32/int32/uint8 values.
+    The array is a strided view skipping the dims, so it is float32 for
+    .fvecs(float vectors), int32 for .ivecs(cast to float vectors) and uint8
+    for .bvecs(binary vectors of dim * 8 bits).
+    """
+    import numpy as np
+
+    valueType = {".fvecs": np.float32, ".ivecs": np.int32, ".bvecs": np.uint8}[
+        os.path.splitext(path)[1]
+    ]
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+    if raw.size < 4:
+        raise ParameterException(f"{path} is empty.")
+    dim = int(raw[:4].view(np.int32)[0])
+    recordSize = 4 + dim * np.dtype(valueType).itemsize
+    if dim <= 0 or raw.size % recordSize:
+        raise ParameterException(f"{path} is not a valid vecs file of dim {dim}.")
+    records = raw.reshape(-1, recordSize)
+    lastDim = int(np.ascontiguousarray(records[-1, :4]).view(np.int32)[0])
+    if lastDim != dim:
+        raise ParameterException(f"Vectors of {path} should have the same dim.")
+    # records[:, 4:].view(valueType) would need numpy>=1.23, which allows
+    # changing the item size of arrays contiguous only along the last axis.
+    return np.ndarray(
+        (len(records), dim),
+        dtype=valueType,
+        buffer=raw,
+        offset=4,
+        strides=(recordSize, np.dtype(valueType).itemsize),
+    )
+
+
+def mmapNpzMember(path, info):
+    "Memory-map an uncompressed member of a .npz file."
+    import numpy as np
+    import struct
+
+    with open(path, "rb") as npz_file:
+        npz_file.seek(info.header_offset)
+        nameLength, extraLength = struct.unpack("<HH", npz_file.read(30)[26:30])
+        npz_file.seek(info.header_offset + 30 + nameLength + extraLength)
+        version = np.lib.format.read_magic(npz_file)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(npz_file)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(npz_file)
+        return np.memmap(
+            path,
+            dtype=dtype,
+            mode="r",
+            shape=shape,
+            order="F" if fortran else "C",
+            offset=npz_file.tell(),
+        )
+
+
+def formatArrayForData(array):
+    "Format a slice of a numpy array as a column to insert."
+    import numpy as np
+
+    if array.ndim == 1:
+        return array
+    if array.ndim != 2:
+        raise ParameterException("Arrays should be 1-D scalars or 2-D vectors.")
+    if array.dtype == np.uint8:
+        return [row.tobytes() for row in array]
+    if array.dtype == np.float32:
+        return np.ascontiguousarray(array)
+    return array.astype(np.float32)
+
+
+def readArrowFileInBatches(path="", batchSize=DefaultImportBatchSize, offset=0):
+    """
+    Stream record batches of a local Parquet(.parquet) or Arrow IPC(.arrow,
+    .feather, .arrows) file. Record batches are sliced and merged into batches
+    of `batchSize` rows and every column is converted as a whole, see
+    formatArrowColumnForData. "begin" and "offset" of the batches are row
+    numbers.
+    """
+    import click
+
+    importPyarrow()
+    click.echo("Reading file from local path.")
+    if not path or not os.path.isfile(path):
+        raise ParameterException(f"No such file {path}")
+    clock = _startClock()
+    recordBatches, rowCount, skipped = openArrowFile(path, batchSize, offset)
+    click.echo(f"Opening {path}({rowCount} rows)...")
+    seq, begin, position, pieces = 0, offset, skipped, []
+    for recordBatch in _timedIterator(recordBatches, clock):
+        if position < offset:
+            skip = min(offset - position, recordBatch.num_rows)
+            recordBatch, position = recordBatch.slice(skip), position + skip
+        while recordBatch.num_rows:
+            # Cut batches at multiples of batchSize, so they are the same
+            # whatever the layout of record batches is.
+            take = min(batchSize - position % batchSize, recordBatch.num_rows)
+            pieces.append(recordBatch.slice(0, take))
+            recordBatch, position = recordBatch.slice(take), position + take
+            if position % batchSize == 0:
+                yield _makeArrowBatch(seq, pieces, begin, position, clock)
+                _startClock(clock)
+                seq, begin, pieces = seq + 1, position, []
+    if pieces:
+        yield _makeArrowBatch(seq, pieces, begin, position, clock)
+    click.echo(f"Processed {position - offset} rows.")
+
+
+def _makeArrowBatch(seq, pieces, begin, end, clock):
+    import click
+
+    table = importPyarrow().Table.from_batches(pieces)
+    if seq == 0:
+        click.echo(f"""Column names are {table.schema.names}""")
+    convertStart = perf_counter()
+    data = [formatArrowColumnForData(c.combine_chunks()) for c in table.columns]
+    timings = _stopClock(clock, convertStart)
+    return _makeBatch(
+        seq, table.schema.names, data, end - begin, begin, end, "rows", timings
+    )
+
+
+def openArrowFile(path, batchSize, offset=0):
+    """
+    Return an iterator of record batches, the number of rows and the number
+    of rows skipped before the first record batch. Parquet row groups before
+    `offset` are not read.
+    """
+    pa = importPyarrow()
+    if path[-8:] == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquetFile = pq.ParquetFile(path, memory_map=True)
+        rowGroups, skipped = [], 0
+        for i in range(parquetFile.num_row_groups):
+            groupRows = parquetFile.metadata.row_group(i).num_rows
+            if not rowGroups and skipped + groupRows <= offset:
+                skipped += groupRows
+                continue
+            rowGroups.append(i)
+        recordBatches = (
+            parquetFile.iter_batches(batch_size=batchSize, row_groups=rowGroups)
+            if rowGroups
+            else iter([])
+        )
+        return recordBatches, parquetFile.metadata.num_rows, skipped
+    source = pa.memory_map(path, "r")
+    if path[-7:] == ".arrows":
+        table = pa.ipc.open_stream(source).read_all()
+    else:
+        table = pa.ipc.open_file(source).read_all()
+    return iter(table.to_batches()), table.num_rows, 0
+
+
+def formatArrowColumnForData(column):
+    """
+    Convert an Arrow column to insert according to getArrowDataTypeName:
+    vectors become a 2-D float32 array or a list of bytes, numeric scalars
+    become numpy arrays and strings become a list.
+    """
+    import numpy as np
+    import pyarrow.types as types
+
+    if column.null_count:
+        raise ParameterException("Columns to import should not contain nulls.")
+    dataType = getArrowDataTypeName(column.type)
+    if dataType == "FLOAT_VECTOR":
+        values = column.flatten().to_numpy(zero_copy_only=False)
+        return values.astype(np.float32, copy=False).reshape(len(column), -1)
+    if dataType == "BINARY_VECTOR":
+        if types.is_fixed_size_binary(column.type):
+            return column.to_pylist()
+        values = column.flatten().to_numpy(zero_copy_only=False)
+        return [row.tobytes() for row in values.reshape(len(column), -1)]
+    if dataType == "STRING":
+        return column.to_pylist()
+    values = column.to_numpy(zero_copy_only=False)
+    return values.astype(NumpyDataTypes[dataType], copy=False)
+
+
+def getArrowDataTypeName(arrowType):
+    "Return the name in Types.FiledDataTypes an Arrow type maps onto."
+    import pyarrow.types as types
+
+    if types.is_fixed_size_binary(arrowType):
+        return "BINARY_VECTOR"
+    if types.is_fixed_size_list(arrowType):
+        valueType = arrowType.value_type
+        if types.is_uint8(valueType):
+            return "BINARY_VECTOR"
+        if types.is_floating(valueType) or types.is_integer(valueType):
+            return "FLOAT_VECTOR"
+    for name, check in [
+        ("BOOL", types.is_boolean),
+        ("INT8", types.is_int8),
+        ("INT16", types.is_int16),
+        ("INT32", types.is_int32),
+        ("INT64", types.is_int64),
+        ("FLOAT", types.is_float32),
+        ("DOUBLE", types.is_float64),
+        ("STRING", types.is_string),
+        ("STRING", types.is_large_string),
+    ]:
+        if check(arrowType):
+            return name
+    raise ParameterException(
+        f"Unsupported column type {arrowType}, vectors should be fixed size lists."
+    )
+
+
+def importPyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ParameterException(
+            "Parquet/Arrow files need pyarrow, please run `pip install pyarrow`."
+        )
+    return pyarrow
+
+
+class ImportJournal(object):
+    """
+    Journal of the batches committed by `import --resume`, kept next to the
+    source file (or in the working directory for remote files) as json lines.
+    The first line records the columns and where rows begin, every other line
+    records the byte range and row count of a committed batch.
+    """
+
+    def __init__(self, path):
+        from threading import Lock
+
+        self.path = f"{getLocalFileName(path)}.journal"
+        self.lock = Lock()
+        self.header = None
+        self.committed = {}
+        self.completed = False
+
+    def load(self):
+        from json import loads
+
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, "r") as journal:
+            for line in journal:
+                if not line.strip():
+                    continue
+                entry = loads(line)
+                if "columns" in entry:
+                    self.header = entry
+                elif entry.get("completed"):
+                    self.completed = True
+                else:
+                    self.committed[entry["begin"]] = entry
+        return self
+
+    def resumeOffset(self):
+        "Return the offset after the batches committed without any gap."
+        if not self.header:
+            return 0
+        offset = self.header["dataOffset"]
+        while offset in self.committed:
+            offset = self.committed[offset]["offset"]
+        return offset
+
+    def committedRows(self):
+        return sum(map(lambda x: x["rows"], self.committed.values()))
+
+    def skipCommitted(self, batches):
+        """
+        Yield batches not committed yet, the first batch read by a new import
+        also writes the journal header.
+        """
+        for batch in batches:
+            if not self.header:
+                header = {"columns": batch["columns"], "dataOffset": batch["begin"]}
+                self._write(header, mode="w")
+                self.header = header
+            committed = self.committed.get(batch["begin"])
+            if committed and committed["offset"] == batch["offset"]:
+                continue
+            yield batch
+
+    def commit(self, batch):
+        entry = {key: batch[key] for key in ["seq", "begin", "offset", "rows"]}
+        self._write(entry)
+        with self.lock:
+            self.committed[batch["begin"]] = entry
+
+    def complete(self):
+        self._write({"completed": True})
+        self.completed = True
+
+    def _write(self, entry, mode="a"):
+        from json import dumps
+
+        with self.lock:
+            with open(self.path, mode) as journal:
+                journal.write(dumps(entry) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+
+
+def getLocalFileName(path):
+    "Return local paths as is and the file name of remote urls."
+    from urllib.parse import urlparse
+
+    if urlparse(path).scheme in ["http", "https"]:
+        return os.path.basename(urlparse(path).path) or "download"
+    return path
+
+
+# For readCsvFileInBatches formatting data column by column.
+def formatColumnsForData(rows=[], columns=None, fields=None):
+    """
+    Parse csv rows into columns. A column named after one of `fields` is
+    decoded by the type of the field, the column of an auto id primary field
+    is left as None since it is not inserted.
+    """
+    fieldsByName = {field["name"]: field for field in fields or []}
+    names = list(columns or [])
+    names += [None] * (len(rows[0]) - len(names))
+    data = []
+    for name, cells in zip(names, zip(*rows)):
+        field = fieldsByName.get(name)
+        if field and field["autoId"]:
+            data.append(None)
+        elif field:
+            data.append(formatColumnByField(cells, field))
+        else:
+            data.append(formatColumnForData(cells))
+    return data
+
+
+def formatColumnByField(cells, field):
+    """
+    Decode cells of a column by the type of its field: integers and floats
+    become numpy arrays, float vectors become a 2-D float32 array of the
+    field's dim and binary vectors become a list of bytes.
+    """
+    import numpy as np
+
+    dataType = field["type"]
+    try:
+        if dataType == "FLOAT_VECTOR":
+            return formatVectorColumnForData(cells, field["dim"])
+        if dataType == "BINARY_VECTOR":
+            return formatBinaryVectorColumnForData(cells, field["dim"])
+        if dataType == "STRING":
+            return list(cells)
+        if dataType == "BOOL":
+            values = [cell.strip().lower() for cell in cells]
+            if not set(values) <= {"true", "false", "1", "0"}:
+                raise ParameterException("Values should be true or false.")
+            return np.array([value in ["true", "1"] for value in values])
+        if dataType in ["INT8", "INT16", "INT32", "INT64"]:
+            return parseIntegers(cells, NumpyDataTypes[dataType])
+        values = parseNumbers(",".join(cells), "float64", len(cells))
+        return castNumbers(values, NumpyDataTypes[dataType])
+    except ParameterException as pe:
+        raise ParameterException(f"Column {field['name']}({dataType}): {str(pe)}")
+
+
+# Parse comma separated numbers in one numpy call.
+def parseNumbers(text, dtype, count):
+    import numpy as np
+
+    try:
+        values = np.fromstring(text, dtype=dtype, sep=",")
+    except ValueError:
+        values = None
+    if values is None or values.size != count:
+        raise ParameterException(f"Values should be numbers of {dtype}.")
+    return values
+
+
+def parseIntegers(cells, dtype):
+    "Parse integer cells as int64 and cast them to `dtype`, see castNumbers."
+    import numpy as np
+
+    try:
+        values = parseNumbers(",".join(cells), "int64", len(cells))
+    except ParameterException:
+        raise ParameterException(f"Values should be numbers of {dtype}.")
+    # Parsing saturates at the int64 limits, tell overflows from the limits.
+    info = np.iinfo(np.int64)
+    for i in np.flatnonzero((values == info.min) | (values == info.max)):
+        if not info.min <= int(cells[i]) <= info.max:
+            raise ParameterException(
+                f"{cells[i].strip()} is out of the range of int64."
+            )
+    return castNumbers(values, dtype)
+
+
+def castNumbers(values, dtype):
+    """
+    Cast parsed numbers to `dtype`, numpy would wrap integers and turn floats
+    out of its range into inf silently.
+    """
+    import numpy as np
+
+    finite = values
+    if np.issubdtype(np.dtype(dtype), np.integer):
+        info = np.iinfo(dtype)
+    else:
+        info = np.finfo(dtype)
+        finite = values[np.isfinite(values)]
+    outside = finite[(finite < info.min) | (finite > info.max)]
+    if outside.size:
+        raise ParameterException(f"{outside[0]} is out of the range of {dtype}.")
+    return values.astype(dtype)
+
+
+def formatColumnForData(cells=()):
+    """
+    Parse all cells of a column in one pass. Vector columns become a 2-D
+    float32 array, integer and float columns become int64/float64 arrays and
+    anything else falls back to json decoding cell by cell.
+    """
+    import numpy as np
+    from json import loads
+
+    if cells[0].lstrip().startswith("["):
+        return formatVectorColumnForData(cells)
+    for dtype in [np.int64, np.float64]:
+        try:
+            return np.array(cells).astype(dtype)
+        except (ValueError, OverflowError):
+            continue
+    return [loads(val) for val in cells]
+
+
+def formatVectorColumnForData(cells=(), dim=None):
+    commaCounts = set(map(lambda x: x.count(","), cells))
+    if len(commaCounts) != 1:
+        raise ParameterException("Vectors of a column should have the same dim.")
+    cellDim = commaCounts.pop() + 1
+    if dim and cellDim != dim:
+        raise ParameterException(f"Vectors should have dim {dim}, not {cellDim}.")
+    flat = ",".join(cells).replace("[", "").replace("]", "")
+    try:
+        vectors = parseNumbers(flat, "float32", cellDim * len(cells))
+    except ParameterException:
+        raise ParameterException("Vectors should be lists of numbers.")
+    return vectors.reshape(len(cells), cellDim)
+
+
+def formatBinaryVectorColumnForData(cells=(), dim=8):
+    """
+    Pack a binary vector column into a list of bytes, every cell is either a
+    list of `dim` bits or a list of `dim / 8` byte values.
+    """
+    import numpy as np
+
+    values = formatVectorColumnForData(cells)
+    if values.shape[1] == dim and np.isin(values, [0, 1]).all():
+        return [row.tobytes() for row in np.packbits(values.astype(np.uint8), axis=1)]
+    isBytes = (values >= 0) & (values <= 255) & (values == np.floor(values))
+    if values.shape[1] == dim // 8 and isBytes.all():
+        return [row.tobytes() for row in values.astype(np.uint8)]
+    raise ParameterException(
+        f"Binary vectors should be lists of {dim} bits or {dim // 8} bytes."
+    )
+
+
+def alignBatchesToFields(batches, fields):
+    """
+    Arrange the columns of every batch in the order of `fields` to insert,
+    the column of an auto id primary field is dropped. Columns are matched by
+    name, ParameterException is raised if they don't match the fields.
+    Vector dims are checked once per column before anything is inserted.
+    """
+    names = [field["name"] for field in fields if not field["autoId"]]
+    autoIdNames = [field["name"] for field in fields if field["autoId"]]
+    for batch in batches:
+        startTime = perf_counter()
+        columns = [name for name in batch["columns"] if name not in autoIdNames]
+        columnData = [
+            column
+            for name, column in zip(batch["columns"], batch["data"])
+            if name not in autoIdNames
+        ]
+        if set(columns) != set(names) or len(columns) != len(names):
+            raise ParameterException(
+                f"Columns {columns} don't match fields {names} of the collection."
+            )
+        data = [columnData[columns.index(name)] for name in names]
+        for field, column in zip(filter(lambda x: not x["autoId"], fields), data):
+            checkVectorColumnDim(column, field)
+        timings = dict(batch.get("timings", {}))
+        timings["convert"] = timings.get("convert", 0.0) + perf_counter() - startTime
+        yield dict(batch, columns=names, data=data, timings=timings)
+
+
+def checkVectorColumnDim(column, field):
+    import numpy as np
+
+    if field["type"] == "FLOAT_VECTOR":
+        expected = field["dim"]
+    elif field["type"] == "BINARY_VECTOR":
+        expected = field["dim"] // 8
+    else:
+        return
+    if isinstance(column, np.ndarray) and column.ndim == 2:
+        dims = {column.shape[1]}
+    elif all(map(lambda x: hasattr(x, "__len__"), column)):
+        dims = set(map(len, column))
+    else:
+        raise ParameterException(
+            f"Column {field['name']} should hold vectors of dim {field['dim']}, not scalars."
+        )
+    if dims != {expected}:
+        raise ParameterException(
+            f"Vectors of column {field['name']} should have dim {field['dim']}, not {sorted(dims)}."
+        )
+
+
+def openExportWriter(path, fields):
+    """
+    Open a writer of query results(lists of {field name: value}) to a .csv,
+    .npy or .parquet file, see CsvExportWriter, NpyExportWriter and
+    ParquetExportWriter. `fields` are dicts like PyOrm.getImportFields.
+    Writers are not thread safe.
+    """
+    extension = os.path.splitext(path)[1]
+    if extension not in ExportFileExtensions:
+        raise ParameterException(
+            f"Export file should be one of {ExportFileExtensions}, not {path}"
+        )
+    try:
+        if extension == ".npy":
+            return NpyExportWriter(path, fields)
+        if extension == ".parquet":
+            return ParquetExportWriter(path, fields)
+        return CsvExportWriter(path, fields)
+    except OSError as e:
+        raise ParameterException(f"Open export file error! {str(e)}")
+
+
+class CsvExportWriter(object):
+    "Write query results as csv rows with headers that `import` reads back."
+
+    def __init__(self, path, fields):
+        from csv import writer
+
+        self.names = [field["name"] for field in fields]
+        self.file = open(path, "w", newline="")
+        self.writer = writer(self.file, delimiter=",")
+        self.writer.writerow(self.names)
+        self.rows = 0
+
+    def write(self, page):
+        self.writer.writerows(
+            [formatValueForCsv(row[name]) for name in self.names] for row in page
+        )
+        self.rows += len(page)
+
+    def close(self):
+        self.file.close()
+
+
+def formatValueForCsv(value):
+    "Format a value the way formatColumnByField decodes it."
+    if isinstance(value, bytes):
+        return str(list(value))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return str(value)
+    return value
+
+
+class NpyExportWriter(object):
+    """
+    Write the vector field of query results to a .npy file and the other
+    fields to a csv sidecar next to it(<name>.csv), which is what `import -s`
+    reads. Float vectors are float32, binary vectors are uint8 bytes. Rows
+    are appended as they come and the array header is rewritten with the
+    number of rows when the writer is closed.
+    """
+
+    HeaderSize = 128
+
+    def __init__(self, path, fields):
+        import numpy as np
+
+        vectorFields = [
+            field
+            for field in fields
+            if field["type"] in ["FLOAT_VECTOR", "BINARY_VECTOR"]
+        ]
+        if len(vectorFields) != 1:
+            raise ParameterException("Export to .npy needs exactly one vector field.")
+        self.field = vectorFields[0]
+        isBinary = self.field["type"] == "BINARY_VECTOR"
+        self.dtype = np.dtype(np.uint8 if isBinary else np.float32)
+        self.width = self.field["dim"] // 8 if isBinary else self.field["dim"]
+        self.rows = 0
+        self.file = open(path, "wb")
+        self.file.write(self._header())
+        scalarFields = [field for field in fields if field is not self.field]
+        self.sidecar = None
+        if scalarFields:
+            sidecarPath = f"{os.path.splitext(path)[0]}.csv"
+            self.sidecar = CsvExportWriter(sidecarPath, scalarFields)
+
+    def write(self, page):
+        import numpy as np
+
+        if not page:
+            return
+        values = [row[self.field["name"]] for row in page]
+        if self.dtype == np.uint8:
+            array = np.frombuffer(b"".join(values), dtype=np.uint8)
+        else:
+            array = np.array(values, dtype=np.float32)
+        if array.size != len(page) * self.width:
+            raise ParameterException(
+                f"Vectors of {self.field['name']} should have dim {self.field['dim']}."
+            )
+        self.file.write(array.tobytes())
+        self.rows += len(page)
+        if self.sidecar:
+            self.sidecar.write(page)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header())
+        self.file.close()
+        if self.sidecar:
+            self.sidecar.close()
+
+    # A version 1.0 header padded to a fixed size, so it can be rewritten.
+    def _header(self):
+        import numpy as np
+        import struct
+
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(self.dtype),
+                "fortran_order": False,
+                "shape": (self.rows, self.width),
+            }
+        )
+        header = header.ljust(self.HeaderSize - 11) + "\n"
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode()
+
+
+class ParquetExportWriter(object):
+    """
+    Write every page of query results as a row group of a Parquet file. Float
+    vectors are fixed size lists of float32 and binary vectors are fixed size
+    binaries, which is what readArrowFileInBatches reads back.
+    """
+
+    def __init__(self, path, fields):
+        pa = importPyarrow()
+        import pyarrow.parquet as pq
+
+        self.schema = pa.schema(
+            [(field["name"], getArrowDataType(field)) for field in fields]
+        )
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = 0
+
+    def write(self, page):
+        pa = importPyarrow()
+
+        if not page:
+            return
+        columns = {name: [row[name] for row in page] for name in self.schema.names}
+        self.writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+        self.rows += len(page)
+
+    def close(self):
+        self.writer.close()
+
+
+def getArrowDataType(field):
+    "Return the Arrow type of a field, the reverse of getArrowDataTypeName."
+    pa = importPyarrow()
+
+    if field["type"] == "FLOAT_VECTOR":
+        return pa.list_(pa.float32(), field["dim"])
+    if field["type"] == "BINARY_VECTOR":
+        return pa.binary(field["dim"] // 8)
+    if field["type"] == "STRING":
+        return pa.string()
+    return pa.from_numpy_dtype(NumpyDataTypes[field["type"]])
+
+
+def readQueryVectorsInBatches(path, nq, field):
+    """
+    Read query vectors of the vector `field` from a .npy/.npz/.fvecs/.bvecs
+    file(the array named after the field or the first one) or a csv file
+    without headers holding a vector per row in its first column. Yield the
+    index of the first query and the vectors for every `nq` queries, float
+    vectors are a 2-D float32 array and binary vectors are a list of bytes.
+    """
+    if nq <= 0:
+        raise ParameterException("nq should be a positive integer.")
+    if os.path.splitext(path)[1] in NumpyFileExtensions:
+        if not os.path.isfile(path):
+            raise ParameterException(f"No such file {path}")
+        arrays = loadNumpyArrays(path)
+        array = arrays.get(field["name"], next(iter(arrays.values())))
+        for begin in range(0, len(array), nq):
+            vectors = formatArrayForData(array[begin : begin + nq])
+            checkVectorColumnDim(vectors, field)
+            yield begin, vectors
+        return
+    begin = 0
+    for batch in readCsvFileInBatches(
+        path, nq, withCol=False, columns=[field["name"]], fields=[field]
+    ):
+        yield begin, batch["data"][0]
+        begin += batch["rows"]
+
+
+def readBaseVectorsInBatches(path, batchSize, field, pkName, sidecar=None, fields=None):
+    """
+    Read the primary keys and the vectors of `field` from a file to import,
+    or exported by `export`(a .npy file of vectors with a csv sidecar of the
+    primary keys), see readFileInBatches. Vectors are the column named after
+    the field or the first column. Yield the keys and vectors of every batch.
+    Primary keys are decoded even if they are auto id.
+    """
+    if fields:
+        fields = [dict(field, autoId=False) for field in fields]
+    for batch in readFileInBatches(path, batchSize, sidecar=sidecar, fields=fields):
+        columns = batch["columns"]
+        if pkName not in columns:
+            raise ParameterException(
+                f"No primary key column {pkName} in {columns}, pass a sidecar file with it."
+            )
+        vectorIndex = columns.index(field["name"]) if field["name"] in columns else 0
+        vectors = batch["data"][vectorIndex]
+        checkVectorColumnDim(vectors, field)
+        yield batch["data"][columns.index(pkName)], vectors
+
+
+class SearchResultWriter(object):
+    """
+    Write search results to a .csv file with a query, rank, id, distance row
+    per hit, or to a .jsonl file with a {"query", "ids", "distances"} line per
+    query. Queries are numbered by their rows in the query file.
+    """
+
+    def __init__(self, path):
+        from csv import writer
+
+        extension = os.path.splitext(path)[1]
+        if extension not in [".csv", ".jsonl"]:
+            raise ParameterException("Output file should be .csv or .jsonl.")
+        try:
+            self.file = open(path, "w", newline="")
+        except OSError as e:
+            raise ParameterException(f"Open output file error! {str(e)}")
+        self.writer = None
+        if extension == ".csv":
+            self.writer = writer(self.file, delimiter=",")
+            self.writer.writerow(["query", "rank", "id", "distance"])
+        self.queries = 0
+
+    def write(self, begin, results):
+        from json import dumps
+
+        for query, hits in enumerate(results, begin):
+            if self.writer:
+                self.writer.writerows(
+                    [query, rank, hit.id, hit.distance] for rank, hit in enumerate(hits)
+                )
+                continue
+            line = {
+                "query": query,
+                "ids": [hit.id for hit in hits],
+                "distances": [hit.distance for hit in hits],
+            }
+            self.file.write(dumps(line) + "\n")
+        self.queries += len(results)
+
+    def close(self):
+        self.file.close()
+
+
 # For readCsvFile formatting data.
 def formatRowForData(row=[], data=[]):
     from json import loads
@@ -96,6 +96,9 @@ IndexTypesMap = {
     },
 }
 
+# Search parameters of the binary vector indexes, which can't be created here.
+BinaryIndexSearchParams = {"BIN_FLAT": [], "BIN_IVF_FLAT": ["nprobe"]}
+
 DupSearchParams = reduce(
     lambda x, y: x + IndexTypesMap[y]["search_parameters"], IndexTypesMap.keys(), []
 )
@@ -119,3 +122,90 @@ DataTypeByNum = {
 }
 
 Operators = ["<", "<=", ">", ">=", "==", "!=", "in"]
+
+# Number of csv rows parsed and inserted at a time when importing.
+DefaultImportBatchSize = 10000
+
+# Number of parsed batches allowed to wait for an insert worker.
+DefaultImportQueueSize = 2
+
+# Times a dropped download is resumed in a row before giving up.
+DefaultDownloadRetries = 5
+
+# Extensions of numpy and ANN benchmark vector files to import.
+NumpyFileExtensions = [".npy", ".npz", ".fvecs", ".ivecs", ".bvecs"]
+
+# Extensions of Parquet and Arrow IPC files to import.
+ArrowFileExtensions = [".parquet", ".arrow", ".feather", ".arrows"]
+
+# Numpy dtypes of numeric scalar data types when importing columnar files.
+NumpyDataTypes = {
+    "BOOL": "bool",
+    "INT8": "int8",
+    "INT16": "int16",
+    "INT32": "int32",
+    "INT64": "int64",
+    "FLOAT": "float32",
+    "DOUBLE": "float64",
+}
+
+# Extensions of compressed files to import, decompressed as a stream.
+CompressionExtensions = [".gz", ".bz2", ".zst"]
+
+# Payload bytes an insert aims at, below the 256MB gRPC message limit of Milvus.
+DefaultInsertByteBudget = 64 << 20
+
+# Rows fetched by a primary key range query of `export`.
+DefaultExportPageSize = 10000
+
+# Primary keys sampled by a search to split partitions into ranges, the topk limit.
+DefaultExportSampleSize = 16384
+
+# Random vectors searched at once to sample primary keys, so the sample doesn't
+# only come from the neighborhood of one of them.
+DefaultExportSampleQueries = 8
+
+# File extensions `export` writes to.
+ExportFileExtensions = [".csv", ".npy", ".parquet"]
+
+# Retries of an insert failed by a transient error like an unavailable proxy.
+DefaultInsertRetries = 5
+
+# Seconds of the first backoff before retrying an insert, doubled every retry.
+DefaultRetryBackoff = 0.5
+
+# Seconds a backoff never exceeds.
+MaxRetryBackoff = 30
+
+# Query vectors sent by a search request of `search -q`.
+DefaultSearchNq = 100
+
+# Bounds of the client-side search result cache, see `cache`.
+DefaultSearchCacheEntries = 1024
+DefaultSearchCacheBytes = 64 << 20
+
+# Seconds a cached search result lives, results may be stale within this window.
+DefaultSearchCacheTtl = 60
+
+# Seconds `bench search` runs for.
+DefaultBenchDuration = 10
+
+# Query and base vectors compared at a time by the brute force of `bench recall`.
+DefaultBruteForceBlockSize = 4096
+
+# Seconds `tune` benchmarks searches for at every value of a search parameter.
+DefaultTuneDuration = 5
+
+# Formats of search, query and query segment results, see `--format`.
+OutputFormats = ["table", "json", "jsonl", "csv"]
+
+QuerySegmentInfoFields = [
+    "segmentID",
+    "collectionID",
+    "partitionID",
+    "mem_size",
+    "num_rows",
+]
+
+# Rows of a page of `query -s`, also bounded by the primary keys a search samples.
+DefaultQueryPageSize = 1000
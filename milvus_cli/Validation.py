@@ -91,6 +91,22 @@ def validateIndexParameter(indexType, metricType, params):
         raise ParameterException("Index params are duplicated.")
 
 
+def validateFlushPolicy(flush):
+    "Parse end|never|every:N into a (mode, every N batches) tuple."
+    if flush in ["end", "never"]:
+        return (flush, 0)
+    mode, _, every = flush.partition(":")
+    try:
+        every = int(every)
+    except ValueError:
+        every = 0
+    if mode != "every" or every <= 0:
+        raise ParameterException(
+            'Flush should be "end", "never" or "every:N" with a positive N.'
+        )
+    return (mode, every)
+
+
 def validateSearchParams(
     data,
     annsField,
@@ -108,9 +124,11 @@ def validateSearchParams(
     import json
 
     result = {}
-    # Validate data
+    # Validate data, which is read in batches from a query file if it is None.
     try:
-        if ".csv" in data:
+        if data is None:
+            pass
+        elif ".csv" in data:
             csvData = readCsvFile(data, withCol=False)
             result["data"] = csvData["data"][0]
         else:
@@ -199,12 +217,12 @@ def validateSearchParams(
     return result
 
 
-def validateQueryParams(expr, partitionNames, outputFields, timeout):
+def validateQueryParams(expr, partitionNames, outputFields, timeout, requireExpr=True):
     result = {}
-    if not expr:
+    if not expr and requireExpr:
         raise ParameterException("expr is empty!")
     # if ' in ' not in expr:
-    if not any(map(lambda x: x in expr, Operators)):
+    if expr and not any(map(lambda x: x in expr, Operators)):
         raise ParameterException(
             f'The query expression only accepts "<field_name> <oprator in {Operators}> [<value>, ...]"!'
         )
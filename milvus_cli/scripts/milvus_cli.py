@@ -7,7 +7,12 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 from utils import PyOrm, Completer, getPackageVersion, WELCOME_MSG, EXIT_MSG
-from Fs import readCsvFile
+from utils import computeGroundTruth, getVectorArray, RecallReport
+from utils import getSearchParamSweep, TuneReport, echoRows, iterSearchRows
+from utils import getIndexSearchParams
+from Fs import readFileInBatches, alignBatchesToFields, ImportJournal
+from Fs import openExportWriter, readQueryVectorsInBatches, SearchResultWriter
+from Fs import readBaseVectorsInBatches
 from Validation import (
     validateParamsByCustomFunc,
     validateCollectionParameter,
@@ -15,19 +20,37 @@ from Validation import (
     validateSearchParams,
     validateQueryParams,
     validateCalcParams,
+    validateFlushPolicy,
 )
 from Types import ParameterException, ConnectException
 from Types import MetricTypes, IndexTypesMap, IndexTypes
+from Types import DefaultImportBatchSize, DefaultImportQueueSize
+from Types import DefaultExportPageSize, DefaultInsertRetries, DefaultSearchNq
+from Types import DefaultBenchDuration, DefaultBruteForceBlockSize
+from Types import DefaultTuneDuration, OutputFormats, QuerySegmentInfoFields
+from Types import DefaultQueryPageSize
 
 
 pass_context = click.make_pass_decorator(PyOrm, ensure=True)
 
 
 @click.group(no_args_is_help=False, add_help_option=False, invoke_without_command=True)
+@click.option(
+    "--format",
+    "outputFormat",
+    help="[Optional] - Format of search, query and show query_segment results, rows of json, jsonl and csv are streamed. Given alone, it sets the format of the session.",
+    default=None,
+    type=click.Choice(OutputFormats),
+)
 @click.pass_context
-def cli(ctx):
+def cli(ctx, outputFormat):
     """Milvus CLI"""
     ctx.obj = PyOrm()
+    if outputFormat and ctx.invoked_subcommand is None:
+        PyOrm.outputFormat = outputFormat
+        click.echo(f"Output format is {outputFormat} from now on.")
+    elif outputFormat:
+        ctx.obj.outputFormat = outputFormat
 
 
 def print_help_msg(command):
@@ -212,7 +235,12 @@ def indexProgress(obj, collection, index):
 @click.pass_obj
 def querySegmentInfo(obj, collection, timeout):
     """Return segments information from query nodes."""
-    click.echo(obj.getQuerySegmentInfo(collection, timeout, prettierFormat=True))
+    if obj.outputFormat == "table":
+        click.echo(obj.getQuerySegmentInfo(collection, timeout, prettierFormat=True))
+        return
+    result = obj.getQuerySegmentInfo(collection, timeout)
+    rows = ([getattr(_, i) for i in QuerySegmentInfoFields] for _ in result)
+    echoRows(QuerySegmentInfoFields, rows, obj.outputFormat)
 
 
 @cli.command()
@@ -868,11 +896,127 @@ def deleteEntities(obj, collectionName, partitionName, timeout):
 
 
 @cli.command()
+@click.option(
+    "-c",
+    "--collection-name",
+    "collectionName",
+    help="[Batch mode] - The name of collection to search.",
+    default=None,
+)
+@click.option(
+    "-q",
+    "--query-file",
+    "queryFile",
+    help="[Optional] - A csv file without headers(a vector per row) or a .npy/.fvecs/.bvecs file of query vectors. Search runs in batch mode without prompts if it is given.",
+    default=None,
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    help="[Batch mode] - The .csv(query, rank, id, distance rows) or .jsonl(a line per query) file results are streamed to.",
+    default=None,
+)
+@click.option(
+    "-f",
+    "--anns-field",
+    "annsField",
+    help="[Batch mode, Optional] - The vector field to search, default is the indexed vector field.",
+    default=None,
+)
+@click.option(
+    "-P",
+    "--params",
+    "params",
+    help='[Batch mode, Optional] - Search parameters of the index(split by "," if multiple), like "nprobe:16".',
+    default="",
+)
+@click.option(
+    "-l",
+    "--limit",
+    "limit",
+    help="[Batch mode, Optional] - The max number of returned records per query, also known as topk, default is 10.",
+    default=10,
+    type=int,
+)
+@click.option(
+    "-e",
+    "--expr",
+    "expr",
+    help="[Batch mode, Optional] - The boolean expression used to filter attribute.",
+    default="",
+)
+@click.option(
+    "-p",
+    "--partitions",
+    "partitionNames",
+    help='[Batch mode, Optional] - The names of partitions to search(split by "," if multiple).',
+    default="",
+)
+@click.option(
+    "-r",
+    "--round-decimal",
+    "roundDecimal",
+    help="[Batch mode, Optional] - The specified number of decimal places of returned distance, default is -1.",
+    default=-1,
+    type=int,
+)
+@click.option(
+    "-n",
+    "--nq",
+    "nq",
+    help=f"[Batch mode, Optional] - The number of query vectors sent by a search request, default is {DefaultSearchNq}.",
+    default=DefaultSearchNq,
+    type=int,
+)
+@click.option(
+    "-w",
+    "--workers",
+    "workers",
+    help="[Batch mode, Optional] - The number of search requests running concurrently, each worker opens its own connection if it is greater than 1, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-t",
+    "--timeout",
+    "timeout",
+    help="[Batch mode, Optional] - An optional duration of time in seconds to allow for each RPC.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-F",
+    "--fail-fast",
+    "failFast",
+    help="[Optional, Flag] - Fail if the collection(or partitions to search) is not loaded instead of loading it.",
+    default=False,
+    is_flag=True,
+)
 @click.pass_obj
-def search(obj):
+def search(
+    obj,
+    collectionName,
+    queryFile,
+    output,
+    annsField,
+    params,
+    limit,
+    expr,
+    partitionNames,
+    roundDecimal,
+    nq,
+    workers,
+    timeout,
+    failFast,
+):
     """
     Conducts a vector similarity search with an optional boolean expression as filter.
 
+    In batch mode(-q), query vectors are read from a file nq at a time, the
+    chunks are searched concurrently and results are streamed to the output
+    file without prompts.
+
     Example-1(import a CSV file):
 
         Collection name (car, test_collection): car
@@ -949,7 +1093,28 @@ def search(obj):
         The names of partitions to search (split by "," if multiple) ['_default'] []:
 
         Timeout []:
+
+    Example-4(batch mode):
+
+        milvus_cli > search -c car -q 'queries.npy' -P nprobe:16 -l 100 -n 500 -w 4 -o 'results.jsonl'
     """
+    if queryFile:
+        return batchSearch(
+            obj,
+            collectionName,
+            queryFile,
+            output,
+            annsField,
+            params,
+            limit,
+            expr,
+            partitionNames,
+            roundDecimal,
+            nq,
+            workers,
+            timeout,
+            failFast,
+        )
     collectionName = click.prompt(
         "Collection name", type=click.Choice(obj._list_collection_names())
     )
@@ -964,7 +1129,7 @@ def search(obj):
     hasIndex = not not indexDetails
     if indexDetails:
         index_type = indexDetails["index_type"]
-        search_parameters = IndexTypesMap[index_type]["search_parameters"]
+        search_parameters = getIndexSearchParams(index_type)
         metric_type = indexDetails["metric_type"]
         click.echo(f"Metric type: {metric_type}")
         metricType = metric_type
@@ -1028,18 +1193,149 @@ def search(obj):
         click.echo("Error!\n{}".format(str(ce)))
     else:
         if export:
-            results = obj.search(collectionName, searchParameters, prettierFormat=False)
+            results = obj.search(
+                collectionName,
+                searchParameters,
+                prettierFormat=False,
+                failFast=failFast,
+            )
+        elif obj.outputFormat != "table":
+            results = obj.search(
+                collectionName,
+                searchParameters,
+                prettierFormat=False,
+                failFast=failFast,
+            )
+            headers = ["query", "rank", "id", "distance"]
+            echoRows(headers, iterSearchRows(results), obj.outputFormat)
         else:
-            results = obj.search(collectionName, searchParameters)
+            results = obj.search(collectionName, searchParameters, failFast=failFast)
             click.echo(f"Search results:\n")
             for idx, item in enumerate(results):
                 click.echo(f"No.{idx+1}:\n{item}\n")
             # click.echo(obj.search(collectionName, searchParameters))
 
 
+def getSearchTarget(
+    obj,
+    collectionName,
+    annsField,
+    params,
+    limit,
+    expr,
+    partitionNames,
+    timeout,
+    roundDecimal=-1,
+):
+    """
+    Return the dict of the vector field to search(the indexed one by default)
+    and the validated search parameters without data.
+    """
+    indexDetails = obj._list_index(collectionName)
+    vectorFields = [
+        field
+        for field in obj.getImportFields(collectionName)
+        if field["type"] in ["FLOAT_VECTOR", "BINARY_VECTOR"]
+    ]
+    if not annsField:
+        annsField = indexDetails.get("field_name") or vectorFields[0]["name"]
+    field = next(filter(lambda x: x["name"] == annsField, vectorFields), None)
+    if not field:
+        raise ParameterException(f"{annsField} is not a vector field.")
+    searchParameters = validateSearchParams(
+        None,
+        annsField,
+        indexDetails.get("metric_type", ""),
+        params,
+        limit,
+        expr,
+        partitionNames,
+        timeout,
+        roundDecimal,
+        hasIndex=not not indexDetails,
+    )
+    return field, searchParameters
+
+
+def batchSearch(
+    obj,
+    collectionName,
+    queryFile,
+    output,
+    annsField,
+    params,
+    limit,
+    expr,
+    partitionNames,
+    roundDecimal,
+    nq,
+    workers,
+    timeout,
+    failFast,
+):
+    try:
+        obj.checkConnection()
+        validateParamsByCustomFunc(
+            obj.getTargetCollection, "Collection Name Error!", collectionName
+        )
+        if not output:
+            raise ParameterException("Output file is required in batch mode.")
+        if workers <= 0:
+            raise ParameterException("Workers should be positive.")
+        field, searchParameters = getSearchTarget(
+            obj,
+            collectionName,
+            annsField,
+            params,
+            limit,
+            expr,
+            partitionNames,
+            timeout,
+            roundDecimal,
+        )
+        queryFile = queryFile.replace('"', "").replace("'", "")
+        queries = readQueryVectorsInBatches(queryFile, nq, field)
+        writer = SearchResultWriter(output.replace('"', "").replace("'", ""))
+        try:
+            result = obj.searchInBatches(
+                collectionName, queries, searchParameters, writer, workers, failFast
+            )
+        finally:
+            writer.close()
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+    else:
+        click.echo(f"\nSearched successfully.\n")
+        click.echo(result)
+
+
 @cli.command()
+@click.option(
+    "-F",
+    "--fail-fast",
+    "failFast",
+    help="[Optional, Flag] - Fail if the collection(or partitions to query) is not loaded instead of loading it.",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "-s",
+    "--page-size",
+    "pageSize",
+    help=f"[Optional] - Walk results in primary key order page by page of about this many rows, so large results are never held at once. The expression may be empty to walk all entities. Default is not paged, {DefaultQueryPageSize} if only -m is given.",
+    default=None,
+    type=int,
+)
+@click.option(
+    "-m",
+    "--max-rows",
+    "maxRows",
+    help="[Optional] - Stop a paged query after this many rows.",
+    default=None,
+    type=int,
+)
 @click.pass_obj
-def query(obj):
+def query(obj, failFast, pageSize, maxRows):
     """
     Query with a set of criteria, and results in a list of records that match the query exactly.
 
@@ -1071,11 +1367,17 @@ def query(obj):
         A list of fields to return(split by "," if multiple) []: id, color, brand
 
         timeout []:
+
+
+    Example 3(paged):
+
+        milvus_cli > --format jsonl query -s 5000 -m 100000
     """
+    paged = pageSize is not None or maxRows is not None
     collectionName = click.prompt(
         "Collection name", type=click.Choice(obj._list_collection_names())
     )
-    expr = click.prompt("The query expression")
+    expr = click.prompt("The query expression", default="" if paged else None)
     partitionNames = click.prompt(
         f'The names of partitions to search (split by "," if multiple) {obj._list_partition_names(collectionName)}',
         default="",
@@ -1087,15 +1389,60 @@ def query(obj):
     timeout = click.prompt("timeout", default="")
     try:
         queryParameters = validateQueryParams(
-            expr, partitionNames, outputFields, timeout
+            expr, partitionNames, outputFields, timeout, requireExpr=not paged
         )
+        if (pageSize is not None and pageSize <= 0) or (
+            maxRows is not None and maxRows <= 0
+        ):
+            raise ParameterException("Page size and max rows should be positive.")
         obj.checkConnection()
     except ParameterException as pe:
         click.echo("Error!\n{}".format(str(pe)))
     except ConnectException as ce:
         click.echo("Error!\n{}".format(str(ce)))
     else:
-        click.echo(obj.query(collectionName, queryParameters))
+        if paged:
+            pages = obj.queryInPages(
+                collectionName,
+                queryParameters,
+                pageSize or DefaultQueryPageSize,
+                maxRows,
+                failFast,
+            )
+            echoPages(pages, obj.outputFormat)
+            return
+        if obj.outputFormat == "table":
+            click.echo(obj.query(collectionName, queryParameters, failFast))
+            return
+        results = obj.query(
+            collectionName, queryParameters, failFast, prettierFormat=False
+        )
+        headers = list(results[0].keys()) if results else []
+        rows = (list(result.values()) for result in results)
+        echoRows(headers, rows, obj.outputFormat)
+
+
+def echoPages(pages, outputFormat):
+    "Write pages of query results as they come, a table per page."
+    from itertools import chain
+
+    firstPage = next(pages, [])
+    headers = list(firstPage[0].keys()) if firstPage else []
+    if outputFormat != "table":
+        rows = (
+            [row.get(name) for name in headers]
+            for page in chain([firstPage], pages)
+            for row in page
+        )
+        echoRows(headers, rows, outputFormat)
+        return
+    pageCount, rowCount = 0, 0
+    for page in chain([firstPage], pages) if firstPage else []:
+        pageCount += 1
+        rowCount += len(page)
+        click.echo(f"Page {pageCount}:")
+        echoRows(headers, ([row.get(name) for name in headers] for row in page))
+    click.echo(f"- {rowCount} rows in {pageCount} pages.")
 
 
 @cli.command("import")
@@ -1120,12 +1467,118 @@ def query(obj):
     default=None,
     type=float,
 )
+@click.option(
+    "-b",
+    "--batch-size",
+    "batchSize",
+    help=f"[Optional] - The number of rows read and inserted at a time, the file is streamed so memory usage depends on it instead of the file size, default is {DefaultImportBatchSize}.",
+    default=DefaultImportBatchSize,
+    type=int,
+)
+@click.option(
+    "-P",
+    "--processes",
+    "processes",
+    help="[Optional] - The number of processes parsing a local csv file in parallel, the file is split into ranges of lines so quoted values must not contain line breaks, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-w",
+    "--workers",
+    "workers",
+    help="[Optional] - The number of threads inserting batches while the file is still being parsed, each of them opens its own connection if it is greater than 1, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-q",
+    "--queue-size",
+    "queueSize",
+    help=f"[Optional] - The number of parsed batches allowed to wait for an insert worker, parsing pauses when the queue is full, default is {DefaultImportQueueSize}.",
+    default=DefaultImportQueueSize,
+    type=int,
+)
+@click.option(
+    "-r",
+    "--resume",
+    "resume",
+    help="[Optional, Flag] - Record committed batches in a journal next to the file(<path>.journal) and skip the batches already committed by a previous interrupted import. Use the same batch size and processes when resuming.",
+    default=False,
+    is_flag=True,
+)
+@click.option(
+    "-s",
+    "--sidecar",
+    "sidecar",
+    help="[Optional] - A csv file with headers holding the scalar columns of a .npy/.npz file, its columns follow the array columns.",
+    default=None,
+)
+@click.option(
+    "-R",
+    "--report",
+    "report",
+    help="[Optional] - Write the telemetry of the import(rows/s, MB/s, seconds of every stage and insert latency percentiles) to a JSON file.",
+    default=None,
+)
+@click.option(
+    "--flush",
+    "flush",
+    help='[Optional] - When to flush inserted entities: "end" once after the last batch, "never", or "every:N" after every N batches, default is "end". The collection entities are counted only if it is flushed.',
+    default="end",
+)
+@click.option(
+    "-n",
+    "--retries",
+    "retries",
+    help=f"[Optional] - The number of times an insert failed by a transient error(unavailable server, timeout) is retried with exponential backoff, default is {DefaultInsertRetries}. Before a retry the primary keys are queried and rows found are not sent again, which needs the collection to be loaded. If the primary key is auto id or the collection is not loaded, retries are turned off with a message before the first batch. Rows of the failed insert not yet visible to query are sent again and may be duplicated.",
+    default=DefaultInsertRetries,
+    type=int,
+)
 @click.argument("path")
 @click.pass_obj
-def importData(obj, collectionName, partitionName, timeout, path):
+def importData(
+    obj,
+    collectionName,
+    partitionName,
+    timeout,
+    batchSize,
+    processes,
+    workers,
+    queueSize,
+    resume,
+    sidecar,
+    report,
+    flush,
+    retries,
+    path,
+):
     """
     Import data from csv file(local or remote) with headers and insert into target collection.
 
+    The file is read and inserted batch by batch, so there is no limit on its size.
+
+    Local .npy/.npz files are memory-mapped and sliced into batches. A .npy
+    file is the column of the only vector field of the collection, or a
+    column named after the file, every array of a .npz file is a column named
+    after its key, scalar columns can be passed with a csv sidecar file. The .fvecs/.ivecs/.bvecs files of ANN benchmarks are read
+    like a .npy file, .bvecs vectors are binary vectors.
+
+    Local Parquet(.parquet) and Arrow IPC(.arrow, .feather, .arrows) files are
+    read record batch by record batch, fixed size list columns are vectors.
+    They need pyarrow to be installed.
+
+    Csv files compressed by gzip(.csv.gz), bzip2(.csv.bz2) or zstd(.csv.zst)
+    are decompressed as a stream, local or remote. Zstd needs zstandard to be
+    installed.
+
+    Columns are matched to the fields of the collection by name and decoded
+    by their types, vector dims are checked before inserting. The column of
+    an auto id primary field is dropped. Binary vectors in csv files are lists
+    of bits or of byte values. Batches are split into inserts of about 64MB
+    estimated from the schema, and smaller ones if the server rejects a
+    message as too large.
+
     Example-1:
 
         milvus_cli > import -c car 'examples/import_csv/vectors.csv'
@@ -1171,16 +1624,62 @@ def importData(obj, collectionName, partitionName, timeout, path):
     Total collection entities:              150000
     Milvus timestamp:           428849214449254403
     --------------------------  ------------------
+
+    Example-3:
+
+        milvus_cli > import -c car -s 'scalars.csv' 'vector.npy'
+
+    Example-4:
+
+        milvus_cli > import -c car 'vectors.parquet'
     """
     try:
         obj.checkConnection()
         validateParamsByCustomFunc(
             obj.getTargetCollection, "Collection Name Error!", collectionName
         )
-        result = readCsvFile(path.replace('"', "").replace("'", ""))
-        data = result["data"]
+        if workers <= 0 or queueSize <= 0:
+            raise ParameterException("Workers and queue size should be positive.")
+        if retries < 0:
+            raise ParameterException("Retries should not be negative.")
+        flushMode, flushEvery = validateFlushPolicy(flush)
+        fields = obj.getImportFields(collectionName)
+        path = path.replace('"', "").replace("'", "")
+        journal = ImportJournal(path).load() if resume else None
+        if journal and journal.completed:
+            click.echo(
+                f"{path} has been imported completely, delete {journal.path} to import it again."
+            )
+            return
+        offset, columns = 0, None
+        if journal and journal.header:
+            offset, columns = journal.resumeOffset(), journal.header["columns"]
+            click.echo(
+                f"Resuming from byte {offset}, {journal.committedRows()} rows have been committed."
+            )
+        batches = readFileInBatches(
+            path, batchSize, processes, offset, columns, sidecar, fields
+        )
+        if journal:
+            batches = journal.skipCommitted(batches)
+        batches = alignBatchesToFields(batches, fields)
         click.secho("Inserting ...", blink=True, bold=True)
-        result = obj.importData(collectionName, data, partitionName, timeout)
+        result = obj.importDataInBatches(
+            collectionName,
+            batches,
+            partitionName,
+            timeout,
+            workers,
+            queueSize,
+            onInserted=journal and journal.commit,
+            fields=fields,
+            reportPath=report,
+            flushMode=flushMode,
+            flushEvery=flushEvery,
+            retries=retries,
+        )
+        if journal:
+            journal.complete()
     except Exception as e:
         click.echo("Error!\n{}".format(str(e)))
     else:
@@ -1188,6 +1687,648 @@ def importData(obj, collectionName, partitionName, timeout, path):
         click.echo(result)
 
 
+@cli.command("export")
+@click.option(
+    "-c",
+    "--collection-name",
+    "collectionName",
+    help="The name of collection to be exported.",
+)
+@click.option(
+    "-p",
+    "--partitions",
+    "partitionNames",
+    help='[Optional] - The names of partitions to export (split by "," if multiple), all partitions are exported by default.',
+    default=None,
+)
+@click.option(
+    "-f",
+    "--fields",
+    "fieldNames",
+    help='[Optional] - The names of fields to export (split by "," if multiple), all fields are exported by default.',
+    default=None,
+)
+@click.option(
+    "-b",
+    "--page-size",
+    "pageSize",
+    help=f"[Optional] - The number of entities fetched by a query, only a page per worker is held in memory, default is {DefaultExportPageSize}.",
+    default=DefaultExportPageSize,
+    type=int,
+)
+@click.option(
+    "-w",
+    "--workers",
+    "workers",
+    help="[Optional] - The number of partitions exported in parallel, each worker opens its own connection if it is greater than 1, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-t",
+    "--timeout",
+    "timeout",
+    help="[Optional] - An optional duration of time in seconds to allow for each RPC. If timeout is not set, the client keeps waiting until the server responds or an error occurs.",
+    default=None,
+    type=float,
+)
+@click.argument("path")
+@click.pass_obj
+def exportData(
+    obj, collectionName, partitionNames, fieldNames, pageSize, workers, timeout, path
+):
+    """
+    Export entities of a collection to a .csv, .npy or .parquet file.
+
+    Entities are fetched page by page with primary key range queries and
+    written as they come, so the collection size is not limited by memory.
+
+    A .csv file has headers and can be imported again. A .npy file holds the
+    vector field, the other fields go to a csv file of the same name next to
+    it, which can be imported again with `import -s`. A .parquet file needs
+    pyarrow to be installed.
+
+    Example-1:
+
+        milvus_cli > export -c car 'car.csv'
+
+    Example-2:
+
+        milvus_cli > export -c car -f id,vector -w 4 'vector.npy'
+    """
+    try:
+        obj.checkConnection()
+        validateParamsByCustomFunc(
+            obj.getTargetCollection, "Collection Name Error!", collectionName
+        )
+        if pageSize <= 0 or workers <= 0:
+            raise ParameterException("Page size and workers should be positive.")
+        fields = obj.getImportFields(collectionName)
+        if fieldNames:
+            names = fieldNames.replace(" ", "").split(",")
+            unknownNames = set(names) - set(map(lambda x: x["name"], fields))
+            if unknownNames:
+                raise ParameterException(f"Unknown fields {sorted(unknownNames)}.")
+            fields = [field for field in fields if field["name"] in names]
+        partitions = partitionNames and partitionNames.replace(" ", "").split(",")
+        path = path.replace('"', "").replace("'", "")
+        writer = openExportWriter(path, fields)
+        try:
+            result = obj.exportData(
+                collectionName, writer, fields, partitions, pageSize, workers, timeout
+            )
+        finally:
+            writer.close()
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+    else:
+        click.echo(f"\nExported successfully.\n")
+        click.echo(result)
+
+
+@cli.group("bench", no_args_is_help=False)
+@click.pass_obj
+def bench(obj):
+    """Benchmark searches of a collection."""
+    pass
+
+
+def readQueryChunks(queryFile, nq, field, sameSize=True):
+    """
+    Read all query vectors of a file as lists of nq vectors, the last short
+    list is dropped if `sameSize` and there are others.
+    """
+    if nq <= 0:
+        raise ParameterException("nq should be positive.")
+    queryFile = queryFile.replace('"', "").replace("'", "")
+    chunks = [
+        vectors.tolist() if hasattr(vectors, "tolist") else vectors
+        for begin, vectors in readQueryVectorsInBatches(queryFile, nq, field)
+    ]
+    if not chunks:
+        raise ParameterException(f"No query vectors in {queryFile}.")
+    if sameSize and len(chunks) > 1 and len(chunks[-1]) < nq:
+        return chunks[:-1]
+    return chunks
+
+
+@bench.command("search")
+@click.option(
+    "-c",
+    "--collection-name",
+    "collectionName",
+    help="The name of collection to search.",
+)
+@click.option(
+    "-q",
+    "--query-file",
+    "queryFile",
+    help="A csv file without headers(a vector per row) or a .npy/.fvecs/.bvecs file of query vectors, searched round robin.",
+)
+@click.option(
+    "-f",
+    "--anns-field",
+    "annsField",
+    help="[Optional] - The vector field to search, default is the indexed vector field.",
+    default=None,
+)
+@click.option(
+    "-P",
+    "--params",
+    "params",
+    help='[Optional] - Search parameters of the index(split by "," if multiple), like "nprobe:16".',
+    default="",
+)
+@click.option(
+    "-l",
+    "--limit",
+    "limit",
+    help="[Optional] - The max number of returned records per query, also known as topk, default is 10.",
+    default=10,
+    type=int,
+)
+@click.option(
+    "-n",
+    "--nq",
+    "nq",
+    help="[Optional] - The number of query vectors sent by a search request, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-e",
+    "--expr",
+    "expr",
+    help="[Optional] - The boolean expression used to filter attribute.",
+    default="",
+)
+@click.option(
+    "-p",
+    "--partitions",
+    "partitionNames",
+    help='[Optional] - The names of partitions to search(split by "," if multiple).',
+    default="",
+)
+@click.option(
+    "-C",
+    "--concurrency",
+    "concurrency",
+    help="[Optional] - The number of search requests in flight at most, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-d",
+    "--duration",
+    "duration",
+    help=f"[Optional] - Seconds to run the benchmark, default is {DefaultBenchDuration}.",
+    default=DefaultBenchDuration,
+    type=float,
+)
+@click.option(
+    "-r",
+    "--rate",
+    "rate",
+    help="[Optional] - Send search requests at this fixed rate(requests/s) instead of a closed loop, latencies count from the scheduled time of requests.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-t",
+    "--timeout",
+    "timeout",
+    help="[Optional] - An optional duration of time in seconds to allow for each RPC.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    help="[Optional] - Save the results as a JSON file to compare runs.",
+    default=None,
+)
+@click.option(
+    "-F",
+    "--fail-fast",
+    "failFast",
+    help="[Optional, Flag] - Fail if the collection(or partitions to search) is not loaded instead of loading it.",
+    default=False,
+    is_flag=True,
+)
+@click.pass_obj
+def benchSearch(
+    obj,
+    collectionName,
+    queryFile,
+    annsField,
+    params,
+    limit,
+    nq,
+    expr,
+    partitionNames,
+    concurrency,
+    duration,
+    rate,
+    timeout,
+    output,
+    failFast,
+):
+    """
+    Run searches for a duration and report QPS and p50/p90/p99/p999 latency.
+
+    The search cache is bypassed. By default the load is closed-loop, each of
+    the concurrent requests is sent once the last one returns, use -r for a
+    fixed rate.
+
+    Example-1:
+
+        milvus_cli > bench search -c car -q 'queries.npy' -P nprobe:16 -C 8 -d 30 -o 'nprobe16.json'
+
+    Example-2:
+
+        milvus_cli > bench search -c car -q 'queries.npy' -P nprobe:16 -C 32 -r 500
+    """
+    try:
+        obj.checkConnection()
+        validateParamsByCustomFunc(
+            obj.getTargetCollection, "Collection Name Error!", collectionName
+        )
+        if not queryFile:
+            raise ParameterException("Query file is required.")
+        if concurrency <= 0 or duration <= 0 or (rate is not None and rate <= 0):
+            raise ParameterException(
+                "Concurrency, duration and rate should be positive."
+            )
+        field, searchParameters = getSearchTarget(
+            obj,
+            collectionName,
+            annsField,
+            params,
+            limit,
+            expr,
+            partitionNames,
+            timeout,
+        )
+        chunks = readQueryChunks(queryFile, nq, field)
+        settings = {
+            "collection": collectionName,
+            "nq": len(chunks[0]),
+            **{k: v for k, v in searchParameters.items() if k != "timeout"},
+        }
+        click.echo(f"Benchmarking search of {collectionName} for {duration}s...")
+        benchmark = obj.benchSearch(
+            collectionName,
+            chunks,
+            searchParameters,
+            concurrency,
+            duration,
+            rate,
+            failFast,
+            settings,
+        )
+        if output:
+            benchmark.writeJson(output.replace('"', "").replace("'", ""))
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+    else:
+        click.echo(benchmark.toTable())
+
+
+def getGroundTruth(
+    obj, collectionName, field, searchParameters, chunks, baseFile, sidecar
+):
+    "Compute the exact neighbours of query chunks by the metric type of index."
+    if not baseFile:
+        raise ParameterException("Base file is required.")
+    limit = searchParameters["limit"]
+    defaultMetricType = "HAMMING" if field["type"] == "BINARY_VECTOR" else "L2"
+    metricType = searchParameters["param"].get("metric_type", defaultMetricType)
+    vectors = [vector for chunk in chunks for vector in chunk]
+    fields = obj.getImportFields(collectionName)
+    pkName = next(filter(lambda x: x["primary"], fields))["name"]
+    baseFile = baseFile.replace('"', "").replace("'", "")
+    sidecar = sidecar and sidecar.replace('"', "").replace("'", "")
+    click.echo(f"Computing exact top {limit} neighbours by {metricType}...")
+    return computeGroundTruth(
+        getVectorArray(vectors, field),
+        readBaseVectorsInBatches(
+            baseFile, DefaultBruteForceBlockSize, field, pkName, sidecar, fields
+        ),
+        metricType,
+        limit,
+    )
+
+
+@bench.command("recall")
+@click.option(
+    "-c",
+    "--collection-name",
+    "collectionName",
+    help="The name of collection to search.",
+)
+@click.option(
+    "-q",
+    "--query-file",
+    "queryFile",
+    help="A csv file without headers(a vector per row) or a .npy/.fvecs/.bvecs file of query vectors.",
+)
+@click.option(
+    "-b",
+    "--base-file",
+    "baseFile",
+    help="A file of the vectors in the collection with their primary keys, like one imported or exported by `export`.",
+)
+@click.option(
+    "-s",
+    "--sidecar",
+    "sidecar",
+    help="[Optional] - A csv file with headers holding the primary keys of a .npy base file, like the one written by `export`.",
+    default=None,
+)
+@click.option(
+    "-f",
+    "--anns-field",
+    "annsField",
+    help="[Optional] - The vector field to search, default is the indexed vector field.",
+    default=None,
+)
+@click.option(
+    "-P",
+    "--params",
+    "params",
+    help='[Optional] - Search parameters of the index(split by "," if multiple), like "nprobe:16".',
+    default="",
+)
+@click.option(
+    "-l",
+    "--limit",
+    "limit",
+    help="[Optional] - The k of recall@k, also the topk of searches, default is 10.",
+    default=10,
+    type=int,
+)
+@click.option(
+    "-n",
+    "--nq",
+    "nq",
+    help=f"[Optional] - The number of query vectors sent by a search request, default is {DefaultSearchNq}.",
+    default=DefaultSearchNq,
+    type=int,
+)
+@click.option(
+    "-t",
+    "--timeout",
+    "timeout",
+    help="[Optional] - An optional duration of time in seconds to allow for each RPC.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    help="[Optional] - Save the recall of every query and the aggregate as a JSON file.",
+    default=None,
+)
+@click.option(
+    "-F",
+    "--fail-fast",
+    "failFast",
+    help="[Optional, Flag] - Fail if the collection is not loaded instead of loading it.",
+    default=False,
+    is_flag=True,
+)
+@click.pass_obj
+def benchRecall(
+    obj,
+    collectionName,
+    queryFile,
+    baseFile,
+    sidecar,
+    annsField,
+    params,
+    limit,
+    nq,
+    timeout,
+    output,
+    failFast,
+):
+    """
+    Report recall@k of searches against exact neighbours computed locally.
+
+    The exact top k neighbours of the queries are found by brute force over
+    the base file with the metric type of the index(L2/IP, HAMMING/TANIMOTO
+    for binary vectors), so the base file should hold every entity of the
+    collection.
+
+    Example:
+
+        milvus_cli > bench recall -c car -q 'queries.npy' -b 'car.npy' -s 'car.csv' -P nprobe:16 -l 100
+    """
+    try:
+        obj.checkConnection()
+        validateParamsByCustomFunc(
+            obj.getTargetCollection, "Collection Name Error!", collectionName
+        )
+        if not queryFile:
+            raise ParameterException("Query file is required.")
+        if limit <= 0:
+            raise ParameterException("Limit should be positive.")
+        field, searchParameters = getSearchTarget(
+            obj, collectionName, annsField, params, limit, "", "", timeout
+        )
+        chunks = readQueryChunks(queryFile, nq, field, sameSize=False)
+        groundTruth = getGroundTruth(
+            obj, collectionName, field, searchParameters, chunks, baseFile, sidecar
+        )
+        click.echo(f"Searching {sum(map(len, chunks))} queries...")
+        resultIds = obj.searchIds(collectionName, chunks, searchParameters, failFast)
+        settings = {
+            "collection": collectionName,
+            **{k: v for k, v in searchParameters.items() if k != "timeout"},
+        }
+        report = RecallReport(resultIds, groundTruth, limit, settings)
+        if output:
+            report.writeJson(output.replace('"', "").replace("'", ""))
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+    else:
+        click.echo(report.toTable())
+
+
+@cli.command("tune")
+@click.option(
+    "-c",
+    "--collection-name",
+    "collectionName",
+    help="The name of collection to tune.",
+)
+@click.option(
+    "-q",
+    "--query-file",
+    "queryFile",
+    help="A csv file without headers(a vector per row) or a .npy/.fvecs/.bvecs file of query vectors.",
+)
+@click.option(
+    "-b",
+    "--base-file",
+    "baseFile",
+    help="A file of the vectors in the collection with their primary keys, like one imported or exported by `export`.",
+)
+@click.option(
+    "-s",
+    "--sidecar",
+    "sidecar",
+    help="[Optional] - A csv file with headers holding the primary keys of a .npy base file, like the one written by `export`.",
+    default=None,
+)
+@click.option(
+    "-v",
+    "--values",
+    "values",
+    help='[Optional] - Values of the search parameter to sweep, like "8,16,32", or "8:256" doubling from 8 to 256. Default is the range of the parameter.',
+    default="",
+)
+@click.option(
+    "-l",
+    "--limit",
+    "limit",
+    help="[Optional] - The k of recall@k, also the topk of searches, default is 10.",
+    default=10,
+    type=int,
+)
+@click.option(
+    "-n",
+    "--nq",
+    "nq",
+    help=f"[Optional] - The number of query vectors sent by a search request, default is {DefaultSearchNq}.",
+    default=DefaultSearchNq,
+    type=int,
+)
+@click.option(
+    "-C",
+    "--concurrency",
+    "concurrency",
+    help="[Optional] - The number of search requests in flight at most when measuring QPS, default is 1.",
+    default=1,
+    type=int,
+)
+@click.option(
+    "-d",
+    "--duration",
+    "duration",
+    help=f"[Optional] - Seconds to measure QPS at every value, default is {DefaultTuneDuration}.",
+    default=DefaultTuneDuration,
+    type=float,
+)
+@click.option(
+    "-t",
+    "--timeout",
+    "timeout",
+    help="[Optional] - An optional duration of time in seconds to allow for each RPC.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-o",
+    "--output",
+    "output",
+    help="[Optional] - Save the points as a JSON file.",
+    default=None,
+)
+@click.option(
+    "-F",
+    "--fail-fast",
+    "failFast",
+    help="[Optional, Flag] - Fail if the collection is not loaded instead of loading it.",
+    default=False,
+    is_flag=True,
+)
+@click.pass_obj
+def tune(
+    obj,
+    collectionName,
+    queryFile,
+    baseFile,
+    sidecar,
+    values,
+    limit,
+    nq,
+    concurrency,
+    duration,
+    timeout,
+    output,
+    failFast,
+):
+    """
+    Sweep the search parameter of the index and print recall vs QPS.
+
+    The parameter(nprobe, ef, search_k or search_length) follows the index
+    type. At every value, recall@k is measured against exact neighbours
+    computed from the base file(see `bench recall`) and QPS by searching for
+    a duration(see `bench search`). Points no other point beats on both
+    recall and QPS are marked as the Pareto frontier.
+
+    Example:
+
+        milvus_cli > tune -c car -q 'queries.npy' -b 'car.npy' -s 'car.csv' -v 1:128 -C 8
+    """
+    try:
+        obj.checkConnection()
+        validateParamsByCustomFunc(
+            obj.getTargetCollection, "Collection Name Error!", collectionName
+        )
+        if not queryFile:
+            raise ParameterException("Query file is required.")
+        if limit <= 0 or concurrency <= 0 or duration <= 0:
+            raise ParameterException(
+                "Limit, concurrency and duration should be positive."
+            )
+        indexDetails = obj._list_index(collectionName)
+        paramName, paramValues = getSearchParamSweep(indexDetails, limit, values)
+        field, searchParameters = getSearchTarget(
+            obj,
+            collectionName,
+            indexDetails["field_name"],
+            "",
+            limit,
+            "",
+            "",
+            timeout,
+        )
+        chunks = readQueryChunks(queryFile, nq, field, sameSize=False)
+        groundTruth = getGroundTruth(
+            obj, collectionName, field, searchParameters, chunks, baseFile, sidecar
+        )
+        points = obj.sweepSearchParam(
+            collectionName,
+            chunks,
+            searchParameters,
+            paramName,
+            paramValues,
+            groundTruth,
+            concurrency,
+            duration,
+            failFast,
+        )
+        settings = {
+            "collection": collectionName,
+            "index_type": indexDetails["index_type"],
+            "metric_type": indexDetails["metric_type"],
+            "limit": limit,
+            "nq": nq,
+            "concurrency": concurrency,
+        }
+        report = TuneReport(paramName, points, settings)
+        if output:
+            report.writeJson(output.replace('"', "").replace("'", ""))
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+    else:
+        click.echo(report.toTable())
+
+
 @cli.command("calc")
 @click.pass_obj
 def calcDistance(obj):
@@ -1354,6 +2495,77 @@ def calcDistance(obj):
         click.echo(result)
 
 
+@cli.command("cache")
+@click.option(
+    "--enable/--disable",
+    "enable",
+    help="[Optional, Flag] - Turn the client-side cache of search results on or off.",
+    default=None,
+)
+@click.option(
+    "-n",
+    "--max-entries",
+    "maxEntries",
+    help="[Optional] - The max number of cached search results.",
+    default=None,
+    type=int,
+)
+@click.option(
+    "-b",
+    "--max-bytes",
+    "maxBytes",
+    help="[Optional] - The max bytes of cached search results.",
+    default=None,
+    type=int,
+)
+@click.option(
+    "-t",
+    "--ttl",
+    "ttl",
+    help="[Optional] - Seconds a cached search result lives.",
+    default=None,
+    type=float,
+)
+@click.option(
+    "-c",
+    "--clear",
+    "clear",
+    help="[Optional, Flag] - Drop all cached search results.",
+    default=False,
+    is_flag=True,
+)
+@click.pass_obj
+def searchCache(obj, enable, maxEntries, maxBytes, ttl, clear):
+    """
+    Configure the client-side cache of search results and show its stats.
+
+    Repeated searches of a collection with the same vectors and parameters are
+    answered from the cache until its results expire, or this client inserts
+    into, deletes from or drops the collection. Inserts of other clients are
+    not seen before the TTL expires.
+
+    Example:
+
+        milvus_cli > cache --enable -n 2048 -t 30
+    """
+    cache = obj.searchCache
+    try:
+        for name, value in [("max entries", maxEntries), ("max bytes", maxBytes)]:
+            if value is not None and value <= 0:
+                raise ParameterException(f"The {name} should be positive.")
+        if ttl is not None and ttl < 0:
+            raise ParameterException("TTL should not be negative.")
+    except Exception as e:
+        click.echo("Error!\n{}".format(str(e)))
+        return
+    if enable is not None:
+        cache.enabled = enable
+    cache.configure(maxEntries, maxBytes, ttl)
+    if clear or enable is False:
+        cache.invalidate()
+    click.echo(cache.toTable())
+
+
 @cli.command("exit")
 def quitapp():
     """Exit the CLI."""
@@ -1366,6 +2578,10 @@ comp = Completer()
 
 
 def runCliPrompt():
+    from multiprocessing import freeze_support
+
+    # Processes parsing `import -P` run the frozen binary again, let them work.
+    freeze_support()
     args = sys.argv
     if args and (args[-1] == "--version"):
         print(f"Milvus CLI v{getPackageVersion()}")
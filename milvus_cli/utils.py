@@ -3,8 +3,18 @@ import readline
 import re
 import os
 from functools import reduce
+from collections import namedtuple
 from Types import DataTypeByNum
-from Types import ParameterException, ConnectException
+from Types import ParameterException, ConnectException, DefaultImportQueueSize
+from Types import DefaultInsertByteBudget, NumpyDataTypes
+from Types import DefaultExportPageSize, DefaultExportSampleSize, IndexTypesMap
+from Types import DefaultExportSampleQueries
+from Types import MetricTypes, BinaryIndexSearchParams
+from Types import DefaultInsertRetries, DefaultRetryBackoff, MaxRetryBackoff
+from Types import DefaultSearchCacheEntries, DefaultSearchCacheBytes
+from Types import DefaultSearchCacheTtl, DefaultBenchDuration
+from Types import DefaultBruteForceBlockSize, DefaultTuneDuration
+from Types import QuerySegmentInfoFields, DefaultQueryPageSize
 from time import time
 
 
@@ -30,10 +40,872 @@ def getMilvusTimestamp(isSimilar=True):
         return int(ts) << 18
 
 
+def runPipeline(items, consume, workers=1, queueSize=DefaultImportQueueSize):
+    """
+    Iterate `items` in the calling thread and hand them to `workers` threads
+    calling `consume(item, workerIndex)` through a queue of `queueSize` items.
+    The producer blocks while the queue is full, so it never runs further than
+    `queueSize` items ahead of the consumers. The first error stops both sides
+    and is raised again.
+    """
+    from queue import Queue, Empty
+    from threading import Thread, Event
+
+    tasks = Queue(maxsize=queueSize)
+    failed = Event()
+    errors = []
+
+    def work(workerIndex):
+        while not failed.is_set():
+            try:
+                item = tasks.get(timeout=0.1)
+            except Empty:
+                continue
+            if item is None:
+                return
+            try:
+                consume(item, workerIndex)
+            except Exception as e:
+                errors.append(e)
+                failed.set()
+
+    threads = [Thread(target=work, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in items:
+            if not _putUntilFailed(tasks, item, failed):
+                break
+    except BaseException:
+        failed.set()
+        raise
+    finally:
+        for thread in threads:
+            _putUntilFailed(tasks, None, failed)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _putUntilFailed(tasks, item, failed):
+    from queue import Full
+
+    while not failed.is_set():
+        try:
+            tasks.put(item, timeout=0.1)
+        except Full:
+            continue
+        return True
+    return False
+
+
+def estimateRowBytes(fields, data=None):
+    """
+    Estimate the insert payload of a row from the fields of a collection, see
+    PyOrm.getImportFields: dim * 4 bytes for float vectors, dim / 8 bytes for
+    binary vectors and the item size of scalars. Strings are measured from the
+    columns of `data` given in the order of fields to insert.
+    """
+    import numpy as np
+
+    fields = [field for field in fields if not field["autoId"]]
+    rowBytes = 0
+    for index, field in enumerate(fields):
+        dataType = field["type"]
+        if dataType == "FLOAT_VECTOR":
+            rowBytes += field["dim"] * 4
+        elif dataType == "BINARY_VECTOR":
+            rowBytes += field["dim"] // 8
+        elif dataType in NumpyDataTypes:
+            rowBytes += np.dtype(NumpyDataTypes[dataType]).itemsize
+        elif data and len(data) > index and len(data[index]):
+            column = data[index]
+            rowBytes += sum(map(lambda x: len(str(x)), column)) // len(column) + 1
+    return rowBytes
+
+
+def isMessageSizeError(e):
+    message = str(e).lower()
+    return any(
+        map(
+            lambda x: x in message,
+            ["resource_exhausted", "larger than max", "message size", "too large"],
+        )
+    )
+
+
+def isTransientError(e):
+    "Whether an error is worth a retry, like an unavailable server or a timeout."
+    code = getattr(e, "code", None)
+    if callable(code):
+        try:
+            if code().name in ["UNAVAILABLE", "DEADLINE_EXCEEDED", "ABORTED"]:
+                return True
+        except Exception:
+            pass
+    message = str(e).lower()
+    return any(
+        map(
+            lambda x: x in message,
+            [
+                "unavailable",
+                "deadline_exceeded",
+                "deadline exceeded",
+                "connection reset",
+                "socket closed",
+                "failed to connect",
+                "timed out",
+            ],
+        )
+    )
+
+
+def getRetryBackoff(attempt):
+    "Seconds to wait before retry `attempt`: full jitter exponential backoff."
+    from random import uniform
+
+    return uniform(0, min(MaxRetryBackoff, DefaultRetryBackoff * (2**attempt)))
+
+
+def takeRows(column, indexes):
+    if hasattr(column, "shape"):
+        return column[indexes]
+    return [column[i] for i in indexes]
+
+
+def formatColumnForInsert(column):
+    """
+    Return `column` as a list of python values, pymilvus rejects numpy arrays
+    as columns and infers no data type from numpy scalars.
+    """
+    if hasattr(column, "tolist"):
+        return column.tolist()
+    return [x.tolist() if hasattr(x, "tolist") else x for x in column]
+
+
+def mergeInsertResults(results):
+    "Merge the results of the inserts of a split batch."
+    from types import SimpleNamespace
+
+    if len(results) == 1:
+        return results[0]
+    return SimpleNamespace(
+        insert_count=sum(map(lambda x: x.insert_count, results)),
+        timestamp=max(map(lambda x: x.timestamp, results), default=0),
+        primary_keys=reduce(lambda x, y: x + list(y.primary_keys), results, []),
+    )
+
+
+def getColumnBytes(column):
+    "Estimate the payload bytes of a column to insert."
+    if hasattr(column, "nbytes"):
+        return column.nbytes
+
+    def getItemBytes(item):
+        if isinstance(item, list):
+            return 4 * len(item)
+        if isinstance(item, (bytes, str)):
+            return len(item)
+        return 8
+
+    return sum(map(getItemBytes, column))
+
+
+class ImportTelemetry(object):
+    """
+    Collect where the time of an import goes: seconds spent reading, parsing
+    and converting batches (recorded in batch["timings"] by Fs) and seconds
+    of insert RPCs, with the latency percentiles of the inserts.
+    """
+
+    Stages = ["read", "parse", "convert", "rpc"]
+
+    def __init__(self):
+        from threading import Lock
+        from time import perf_counter
+
+        self.lock = Lock()
+        self.startTime = perf_counter()
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.stages = {stage: 0.0 for stage in self.Stages}
+        self.latencies = []
+
+    def record(self, batch, rpcSeconds):
+        batchBytes = sum(map(getColumnBytes, batch["data"]))
+        with self.lock:
+            self.rows += batch.get("rows") or len(batch["data"][0])
+            self.bytes += batchBytes
+            for stage, seconds in batch.get("timings", {}).items():
+                self.stages[stage] += seconds
+            self.stages["rpc"] += rpcSeconds
+            self.latencies.append(rpcSeconds)
+
+    def stop(self):
+        from time import perf_counter
+
+        self.seconds = perf_counter() - self.startTime
+        return self
+
+    def toDict(self):
+        import numpy as np
+
+        seconds = self.seconds or 1e-9
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        return {
+            "batches": len(self.latencies),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows / seconds, 1),
+            "mb_per_second": round(self.bytes / seconds / (1 << 20), 2),
+            "stage_seconds": {k: round(v, 3) for k, v in self.stages.items()},
+            "insert_latency_ms": {
+                f"p{p}": round(float(np.percentile(latencies, p)), 2)
+                for p in [50, 95, 99]
+            },
+        }
+
+    def toTable(self):
+        report = self.toDict()
+        wallSeconds = self.seconds or 1e-9
+        stageRows = [
+            [stage, round(seconds, 3), f"{round(100 * seconds / wallSeconds, 1)}%"]
+            for stage, seconds in self.stages.items()
+        ]
+        stageTable = tabulate(
+            stageRows,
+            headers=["Stage", "Seconds", "Of Wall Time"],
+            tablefmt="grid",
+        )
+        latency = report["insert_latency_ms"]
+        summary = tabulate(
+            [
+                ["Rows/s: ", report["rows_per_second"]],
+                ["Payload MB/s: ", report["mb_per_second"]],
+                [
+                    "Insert latency p50/p95/p99(ms): ",
+                    f"{latency['p50']}/{latency['p95']}/{latency['p99']}",
+                ],
+            ]
+        )
+        return f"{summary}\n\n{stageTable}"
+
+    def writeJson(self, path):
+        writeJsonReport(self.toDict(), path)
+
+
+def writeJsonReport(report, path):
+    from json import dump
+
+    try:
+        with open(path, "w") as report_file:
+            dump(report, report_file, indent=2)
+    except OSError as e:
+        raise ParameterException(f"Write report error! {str(e)}")
+
+
+class SearchBenchmark(object):
+    """
+    Collect the latencies and errors of the requests of a search benchmark,
+    see PyOrm.benchSearch. `settings` describe the run in the JSON report so
+    runs can be compared.
+    """
+
+    Percentiles = [50, 90, 99, 99.9]
+
+    def __init__(self, concurrency, rate=None, settings=None):
+        from threading import Lock
+        from time import perf_counter
+
+        self.lock = Lock()
+        self.concurrency = concurrency
+        self.rate = rate
+        self.settings = settings or {}
+        self.startTime = perf_counter()
+        self.seconds = 0.0
+        self.queries = 0
+        self.latencies = []
+        self.errors = 0
+        self.firstError = None
+
+    def record(self, seconds, nq, error=None):
+        with self.lock:
+            if error is not None:
+                self.errors += 1
+                self.firstError = self.firstError or str(error)
+                return
+            self.queries += nq
+            self.latencies.append(seconds)
+
+    def stop(self):
+        from time import perf_counter
+
+        self.seconds = perf_counter() - self.startTime
+        return self
+
+    def toDict(self):
+        import numpy as np
+
+        seconds = self.seconds or 1e-9
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        latency = {
+            f"p{str(p).replace('.', '')}": round(float(np.percentile(latencies, p)), 2)
+            for p in self.Percentiles
+        }
+        latency["mean"] = round(float(latencies.mean()), 2)
+        latency["max"] = round(float(latencies.max()), 2)
+        return {
+            **self.settings,
+            "mode": "fixed-rate" if self.rate else "closed-loop",
+            "concurrency": self.concurrency,
+            "target_requests_per_second": self.rate,
+            "seconds": round(self.seconds, 3),
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "first_error": self.firstError,
+            "queries": self.queries,
+            "requests_per_second": round(len(self.latencies) / seconds, 1),
+            "queries_per_second": round(self.queries / seconds, 1),
+            "latency_ms": latency,
+        }
+
+    def toTable(self):
+        report = self.toDict()
+        latency = report["latency_ms"]
+        rows = [
+            ["Mode: ", f"{report['mode']}, concurrency {self.concurrency}"],
+            ["Requests(errors): ", f"{report['requests']}({report['errors']})"],
+            ["Seconds: ", report["seconds"]],
+            ["QPS(queries/s): ", report["queries_per_second"]],
+            ["Requests/s: ", report["requests_per_second"]],
+            [
+                "Latency p50/p90/p99/p999(ms): ",
+                f"{latency['p50']}/{latency['p90']}/{latency['p99']}/{latency['p999']}",
+            ],
+            ["Latency mean/max(ms): ", f"{latency['mean']}/{latency['max']}"],
+        ]
+        if self.rate:
+            rows.insert(1, ["Target requests/s: ", self.rate])
+        if self.firstError:
+            rows.append(["First error: ", self.firstError])
+        return tabulate(rows)
+
+    def writeJson(self, path):
+        writeJsonReport(self.toDict(), path)
+
+
+def echoRows(headers, rows, outputFormat="table"):
+    """
+    Write `rows` to stdout in an output format of OutputFormats. Rows are
+    written to json(an array of objects), jsonl(an object per line) and csv
+    as they come from the iterable, only a table is rendered as a whole.
+    """
+    import click
+    from json import dumps
+    from Fs import formatValueForCsv
+
+    if outputFormat == "table":
+        click.echo(tabulate(rows, headers=headers, tablefmt="grid", showindex=True))
+        return
+    stream = click.get_text_stream("stdout")
+    if outputFormat == "csv":
+        from csv import writer
+
+        csvWriter = writer(stream, lineterminator="\n")
+        csvWriter.writerow(headers)
+        for row in rows:
+            csvWriter.writerow(map(formatValueForCsv, row))
+        stream.flush()
+        return
+    separator = "[\n" if outputFormat == "json" else ""
+    for row in rows:
+        line = dumps(dict(zip(headers, row)), default=formatValueForJson)
+        stream.write(f"{separator}{line}")
+        separator = ",\n" if outputFormat == "json" else "\n"
+    if outputFormat == "json":
+        stream.write("[]\n" if separator == "[\n" else "\n]\n")
+    elif separator:
+        stream.write("\n")
+    stream.flush()
+
+
+def formatValueForJson(value):
+    "Format values json doesn't know, like bytes of binary vectors."
+    if isinstance(value, bytes):
+        return list(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def iterSearchRows(results):
+    "Yield a [query, rank, id, distance] row for every hit of search results."
+    for query, hits in enumerate(results):
+        for rank, hit in enumerate(hits):
+            yield [query, rank, hit.id, hit.distance]
+
+
+def getIndexedVectorField(fields, indexDetails=None):
+    "Return the vector field of an index, or the first vector field."
+    vectorFields = [
+        field for field in fields if field["type"] in ["FLOAT_VECTOR", "BINARY_VECTOR"]
+    ]
+    if indexDetails:
+        vectorFields = [
+            field
+            for field in vectorFields
+            if field["name"] == indexDetails["field_name"]
+        ]
+    return vectorFields[0]
+
+
+def getPrimaryKeyRangeExprs(pkName, sample, rowCount, pageSize):
+    """
+    Split the primary keys of `rowCount` entities into range expressions of
+    about `pageSize` entities, cut at every k-th primary key of a `sample`.
+    The first and the last ranges are open, so every entity is in one range.
+    A biased sample leaves larger ranges, see PyOrm.queryPrimaryKeyRanges.
+    """
+    sample = sorted(set(sample))
+    step = max(pageSize * len(sample) // max(rowCount, 1), 1)
+    bounds = sample[step::step]
+    if not bounds:
+        return [f"{pkName} >= {-(1 << 63) + 1}"]
+    exprs = [f"{pkName} < {bounds[0]}"]
+    for low, high in zip(bounds, bounds[1:]):
+        exprs.append(f"{pkName} >= {low} && {pkName} < {high}")
+    exprs.append(f"{pkName} >= {bounds[-1]}")
+    return exprs
+
+
+def splitPrimaryKeys(pkName, pks, pageSize):
+    "Split primary keys into range expressions of at most `pageSize` of them."
+    pks = sorted(pks)
+    pages = -(-len(pks) // max(pageSize, 1))
+    for i in range(pages):
+        page = pks[i * len(pks) // pages : (i + 1) * len(pks) // pages]
+        yield f"{pkName} >= {page[0]} && {pkName} <= {page[-1]}"
+
+
+def getVectorArray(vectors, field):
+    "Stack vectors of a column into a 2-D array, bytes of binary ones as uint8."
+    import numpy as np
+
+    if field["type"] == "BINARY_VECTOR":
+        array = np.frombuffer(b"".join(vectors), dtype=np.uint8)
+        return array.reshape(len(vectors), -1)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def getDistances(queries, queryNorms, base, baseNorms, metricType):
+    "Distances of every query to every base vector, smaller is closer."
+    import numpy as np
+
+    dots = queries @ base.T
+    if metricType == "IP":
+        return -dots
+    if metricType == "TANIMOTO":
+        unions = queryNorms[:, None] + baseNorms[None, :] - dots
+        return 1 - dots / np.maximum(unions, 1)
+    # Squared L2, or HAMMING of unpacked bits.
+    return queryNorms[:, None] - 2 * dots + baseNorms[None, :]
+
+
+def computeGroundTruth(
+    queries, baseBatches, metricType, k, blockSize=DefaultBruteForceBlockSize
+):
+    """
+    Find the exact top `k` neighbours of `queries`(a 2-D array, see
+    getVectorArray) among `baseBatches` of (ids, vectors) by brute force.
+    Blocks of `blockSize` queries are compared with every batch and only
+    the best `k` candidates of each query are kept, so memory stays bounded
+    whatever the size of the base. Binary vectors are unpacked into bits so
+    HAMMING and TANIMOTO are matrix products too. Return the ids of the
+    neighbours of every query, closest first.
+    """
+    import numpy as np
+
+    if metricType not in MetricTypes:
+        raise ParameterException(f"Metric type should be one of {MetricTypes}.")
+
+    def prepare(vectors):
+        if metricType in ["HAMMING", "TANIMOTO"]:
+            vectors = np.unpackbits(vectors, axis=1)
+            return vectors.astype(np.float32), vectors.sum(axis=1, dtype=np.float32)
+        vectors = vectors.astype(np.float32)
+        return vectors, np.einsum("ij,ij->i", vectors, vectors)
+
+    queries, queryNorms = prepare(queries)
+    bestIds = np.empty((len(queries), 0), dtype=np.int64)
+    bestDistances = np.empty((len(queries), 0), dtype=np.float32)
+    for ids, vectors in baseBatches:
+        base, baseNorms = prepare(vectors)
+        ids = np.asarray(ids, dtype=np.int64)
+        blockIds, blockDistances = [], []
+        for begin in range(0, len(queries), blockSize):
+            end = begin + blockSize
+            distances = np.concatenate(
+                [
+                    bestDistances[begin:end],
+                    getDistances(
+                        queries[begin:end],
+                        queryNorms[begin:end],
+                        base,
+                        baseNorms,
+                        metricType,
+                    ),
+                ],
+                axis=1,
+            )
+            candidates = np.concatenate(
+                [bestIds[begin:end], np.broadcast_to(ids, (len(distances), len(ids)))],
+                axis=1,
+            )
+            if distances.shape[1] > k:
+                top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                distances = np.take_along_axis(distances, top, axis=1)
+                candidates = np.take_along_axis(candidates, top, axis=1)
+            blockIds.append(candidates)
+            blockDistances.append(distances)
+        bestIds = np.concatenate(blockIds)
+        bestDistances = np.concatenate(blockDistances)
+    order = np.argsort(bestDistances, axis=1, kind="stable")
+    return np.take_along_axis(bestIds, order, axis=1)
+
+
+class RecallReport(object):
+    """
+    Recall@k of every query, the share of its exact top k neighbours found
+    by a search, and their aggregate. See computeGroundTruth.
+    """
+
+    def __init__(self, resultIds, groundTruth, k, settings=None):
+        self.k = k
+        self.settings = settings or {}
+        self.recalls = [
+            len(set(ids[:k]) & set(truth[:k].tolist())) / max(min(k, len(truth)), 1)
+            for ids, truth in zip(resultIds, groundTruth)
+        ]
+
+    def mean(self):
+        return sum(self.recalls) / max(len(self.recalls), 1)
+
+    def toDict(self, perQuery=True):
+        import numpy as np
+
+        recalls = np.array(self.recalls or [0.0])
+        report = {
+            **self.settings,
+            "k": self.k,
+            "queries": len(self.recalls),
+            "recall_mean": round(float(recalls.mean()), 4),
+            "recall_min": round(float(recalls.min()), 4),
+            "recall_p5": round(float(np.percentile(recalls, 5)), 4),
+            "queries_below_one": int((recalls < 1).sum()),
+        }
+        if perQuery:
+            report["recalls"] = [round(recall, 4) for recall in self.recalls]
+        return report
+
+    def toTable(self):
+        report = self.toDict(perQuery=False)
+        return tabulate(
+            [
+                ["Queries: ", report["queries"]],
+                [f"Recall@{self.k} mean: ", report["recall_mean"]],
+                [
+                    f"Recall@{self.k} min/p5: ",
+                    f"{report['recall_min']}/{report['recall_p5']}",
+                ],
+                ["Queries with recall < 1: ", report["queries_below_one"]],
+            ]
+        )
+
+    def writeJson(self, path):
+        writeJsonReport(self.toDict(), path)
+
+
+def getDoublingValues(start, stop):
+    "Values doubling from `start` up to `stop`, which is always the last one."
+    values, value = [], max(start, 1)
+    while value < stop:
+        values.append(value)
+        value *= 2
+    return values + [stop]
+
+
+def getIndexSearchParams(indexType):
+    "Return the search parameters of an index type, binary ones included."
+    if indexType in IndexTypesMap:
+        return IndexTypesMap[indexType]["search_parameters"]
+    if indexType in BinaryIndexSearchParams:
+        return BinaryIndexSearchParams[indexType]
+    raise ParameterException(f"Index type {indexType} is not supported.")
+
+
+def getSearchParamSweep(indexDetails, limit, values=""):
+    """
+    Return the search parameter of an index(see IndexTypesMap) and the values
+    to sweep, `values` like "8,16,32", or "8:256" doubling from 8 to 256.
+    Without `values`, the range of the parameter is swept from its cheapest
+    value that keeps `limit` results.
+    """
+    indexType = indexDetails.get("index_type")
+    if not indexType:
+        raise ParameterException("The collection has no index to tune.")
+    names = getIndexSearchParams(indexType)
+    names = [name for name in names if name != "metric_type"]
+    if not names:
+        raise ParameterException(f"{indexType} has no search parameter to tune.")
+    paramName, params = names[0], indexDetails.get("params") or {}
+    if isinstance(params, str):
+        from json import loads
+
+        params = loads(params)
+    try:
+        if ":" in values:
+            start, stop = map(int, values.split(":"))
+            return paramName, getDoublingValues(start, stop)
+        if values:
+            return paramName, [int(value) for value in values.split(",")]
+    except ValueError:
+        raise ParameterException('Values should be like "8,16,32" or "8:256".')
+    if paramName == "nprobe":
+        return paramName, getDoublingValues(1, min(params.get("nlist", 1024), 1024))
+    if paramName == "ef":
+        return paramName, getDoublingValues(limit, 16 * limit)
+    if paramName == "search_k":
+        # -1 means n_trees * topk for ANNOY.
+        start = params.get("n_trees", 8) * limit
+        return paramName, getDoublingValues(start, 64 * start)
+    return paramName, getDoublingValues(10, 300)
+
+
+class TuneReport(object):
+    """
+    Recall and QPS of searches at every value of a search parameter, with the
+    points on the Pareto frontier: no other point has both higher recall and
+    higher QPS. See PyOrm.sweepSearchParam.
+    """
+
+    def __init__(self, paramName, points, settings=None):
+        self.paramName = paramName
+        self.points = points
+        self.settings = settings or {}
+        for point in points:
+            point["pareto"] = not any(
+                other["recall"] >= point["recall"]
+                and other["qps"] >= point["qps"]
+                and (other["recall"], other["qps"]) != (point["recall"], point["qps"])
+                for other in points
+            )
+
+    def toDict(self):
+        return {**self.settings, "param": self.paramName, "points": self.points}
+
+    def toTable(self):
+        return tabulate(
+            [
+                [
+                    point[self.paramName],
+                    point["recall"],
+                    point["qps"],
+                    point["p99_ms"],
+                    point["errors"],
+                    "*" if point["pareto"] else "",
+                ]
+                for point in self.points
+            ],
+            headers=[self.paramName, "Recall", "QPS", "p99(ms)", "Errors", "Pareto"],
+            tablefmt="grid",
+        )
+
+    def writeJson(self, path):
+        writeJsonReport(self.toDict(), path)
+
+
+# A hit of search results kept by SearchCache, plain values instead of the Hit
+# of pymilvus so its size can be measured.
+SearchHit = namedtuple("SearchHit", ["id", "distance", "score"])
+
+
+class SearchCache(object):
+    """
+    A LRU cache of search results bounded by `maxEntries`, `maxBytes` and a
+    `ttl` in seconds. Keys are built by makeKey from the collection name, a
+    hash of the query vectors and the other search parameters. The size of
+    an entry is measured by getSize.
+    """
+
+    def __init__(
+        self,
+        maxEntries=DefaultSearchCacheEntries,
+        maxBytes=DefaultSearchCacheBytes,
+        ttl=DefaultSearchCacheTtl,
+    ):
+        from collections import OrderedDict
+        from threading import Lock
+
+        self.enabled = False
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.ttl = ttl
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def makeKey(collectionName, searchParameters):
+        import hashlib
+        import json
+        import numpy as np
+
+        data = np.asarray(searchParameters.get("data", []))
+        digest = hashlib.sha1(str((data.dtype, data.shape)).encode())
+        digest.update(data.tobytes())
+        # Timeout doesn't change results.
+        params = {
+            k: v for k, v in searchParameters.items() if k not in ["data", "timeout"]
+        }
+        return (
+            collectionName,
+            digest.hexdigest(),
+            json.dumps(params, sort_keys=True, default=str),
+        )
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry["expireAt"] <= time():
+                self._evict(key)
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    @staticmethod
+    def getSize(value):
+        "Bytes of nested lists and tuples of values, measured by sys.getsizeof."
+        from sys import getsizeof
+
+        if isinstance(value, (list, tuple)):
+            return getsizeof(value) + sum(map(SearchCache.getSize, value))
+        return getsizeof(value)
+
+    def put(self, key, value):
+        size = self.getSize(key) + self.getSize(value)
+        if size > self.maxBytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._evict(key)
+            self.entries[key] = {
+                "value": value,
+                "size": size,
+                "expireAt": time() + self.ttl,
+            }
+            self.bytes += size
+            self._shrink()
+
+    def configure(self, maxEntries=None, maxBytes=None, ttl=None):
+        with self.lock:
+            self.maxEntries = maxEntries or self.maxEntries
+            self.maxBytes = maxBytes or self.maxBytes
+            self.ttl = self.ttl if ttl is None else ttl
+            self._shrink()
+
+    def invalidate(self, collectionName=None):
+        "Drop the entries of a collection, or all entries if it is None."
+        with self.lock:
+            for key in list(self.entries):
+                if collectionName is None or key[0] == collectionName:
+                    self._evict(key)
+
+    def _shrink(self):
+        while len(self.entries) > self.maxEntries or self.bytes > self.maxBytes:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, key):
+        self.bytes -= self.entries.pop(key)["size"]
+
+    def toTable(self):
+        return tabulate(
+            [
+                ["Enabled: ", self.enabled],
+                ["Entries: ", f"{len(self.entries)}/{self.maxEntries}"],
+                ["Bytes: ", f"{self.bytes}/{self.maxBytes}"],
+                ["TTL(s): ", self.ttl],
+                ["Hits: ", self.hits],
+                ["Misses: ", self.misses],
+            ]
+        )
+
+
+class LoadState(object):
+    """
+    Remember the collections(or partitions of them) known to be loaded, so
+    search and query don't call load on every invocation, see
+    PyOrm.ensureLoaded. The Collection objects of them are kept as well, so
+    repeated searches don't describe the collection again.
+    """
+
+    def __init__(self):
+        from threading import Lock
+
+        self.lock = Lock()
+        self.loaded = set()
+        self.collections = {}
+
+    @staticmethod
+    def makeKey(collectionName, partitionNames=None):
+        return (collectionName, tuple(sorted(partitionNames or [])))
+
+    def isLoaded(self, collectionName, partitionNames=None):
+        with self.lock:
+            return (collectionName, ()) in self.loaded or (
+                self.makeKey(collectionName, partitionNames) in self.loaded
+            )
+
+    def markLoaded(self, collectionName, partitionNames=None):
+        with self.lock:
+            self.loaded.add(self.makeKey(collectionName, partitionNames))
+
+    def getCollection(self, collectionName):
+        with self.lock:
+            return self.collections.get(collectionName)
+
+    def keepCollection(self, collectionName, collection):
+        with self.lock:
+            self.collections[collectionName] = collection
+
+    def forget(self, collectionName):
+        with self.lock:
+            self.loaded = set(filter(lambda x: x[0] != collectionName, self.loaded))
+            self.collections.pop(collectionName, None)
+
+    def clear(self):
+        with self.lock:
+            self.loaded = set()
+            self.collections = {}
+
+
 class PyOrm(object):
     host = "127.0.0.1"
     port = 19530
     alias = "default"
+    # Shared by the PyOrm created for every command of a CLI session.
+    searchCache = SearchCache()
+    loadState = LoadState()
+    # Output format of search, query and query segment results, see echoRows.
+    outputFormat = "table"
 
     def connect(self, alias=None, host=None, port=None, disconnect=False):
         self.alias = alias
@@ -41,6 +913,9 @@ class PyOrm(object):
         self.port = port
         from pymilvus import connections
 
+        # Cached results and load states belong to the previous server.
+        self.searchCache.invalidate()
+        self.loadState.clear()
         if disconnect:
             connections.disconnect(alias)
             return
@@ -127,8 +1002,8 @@ class PyOrm(object):
             showindex=True,
         )
 
-    def flushCollectionByNumEntities(self, collectionName):
-        col = self.getTargetCollection(collectionName)
+    def flushCollectionByNumEntities(self, collectionName, alias=None):
+        col = self.getTargetCollection(collectionName, alias)
         return col.num_entities
 
     def showCollectionLoadingProgress(self, collectionName, partition_names=None):
@@ -142,11 +1017,60 @@ class PyOrm(object):
 
         return index_building_progress(collectionName, index_name, self.alias)
 
-    def getTargetCollection(self, collectionName):
+    def ensureLoaded(
+        self, collectionName, partitionNames=None, collection=None, failFast=False
+    ):
+        """
+        Load a collection, or only `partitionNames` of it, unless they are
+        known to be loaded or loading_progress says so. Raise instead of
+        loading if `failFast`. Empty collections are loaded anyway, their
+        progress tells nothing and there is nothing to wait for.
+        """
+        from pymilvus import loading_progress
+
+        state = self.loadState
+        if state.isLoaded(collectionName, partitionNames):
+            return
+        try:
+            progress = loading_progress(collectionName, partitionNames, self.alias)
+            loaded = progress.get("num_loaded_entities")
+            total = progress.get("num_total_entities")
+        except Exception as e:
+            loaded, total = 0, None
+        if not (total and loaded >= total):
+            if failFast and total != 0:
+                options = " -p ".join([collectionName] + list(partitionNames or []))
+                raise ParameterException(
+                    f"{collectionName} is not loaded, run `load -c {options}` first."
+                )
+            collection = collection or self.getTargetCollection(collectionName)
+            if partitionNames:
+                collection.load(partitionNames)
+            else:
+                collection.load()
+        state.markLoaded(collectionName, partitionNames)
+
+    def getLoadedCollection(self, collectionName, partitionNames=None, failFast=False):
+        """
+        Return the Collection of `collectionName` after ensureLoaded, the one
+        kept in loadState if the collection is known to be loaded.
+        """
+        state = self.loadState
+        collection = state.getCollection(collectionName)
+        if collection is None or not state.isLoaded(collectionName, partitionNames):
+            collection = collection or self.getTargetCollection(collectionName)
+            self.ensureLoaded(collectionName, partitionNames, collection, failFast)
+            state.keepCollection(collectionName, collection)
+        return collection
+
+    def getTargetCollection(self, collectionName, alias=None):
         from pymilvus import Collection
 
         try:
-            target = Collection(collectionName)
+            if alias:
+                target = Collection(collectionName, using=alias)
+            else:
+                target = Collection(collectionName)
         except Exception as e:
             raise ParameterException("Collection error!\n")
         else:
@@ -164,6 +1088,7 @@ class PyOrm(object):
     def loadCollection(self, collectionName):
         target = self.getTargetCollection(collectionName)
         target.load()
+        self.loadState.markLoaded(collectionName)
         result = self.showCollectionLoadingProgress(collectionName)
         return tabulate(
             [
@@ -178,6 +1103,7 @@ class PyOrm(object):
         )
 
     def releaseCollection(self, collectionName):
+        self.loadState.forget(collectionName)
         target = self.getTargetCollection(collectionName)
         target.release()
         result = self.showCollectionLoadingProgress(collectionName)
@@ -194,6 +1120,7 @@ class PyOrm(object):
         )
 
     def releasePartition(self, collectionName, partitionName):
+        self.loadState.forget(collectionName)
         targetPartition = self.getTargetPartition(collectionName, partitionName)
         targetPartition.release()
         result = self.showCollectionLoadingProgress(collectionName, [partitionName])
@@ -213,6 +1140,7 @@ class PyOrm(object):
     def loadPartition(self, collectionName, partitionName):
         targetPartition = self.getTargetPartition(collectionName, partitionName)
         targetPartition.load()
+        self.loadState.markLoaded(collectionName, [partitionName])
         result = self.showCollectionLoadingProgress(collectionName, [partitionName])
         return result
 
@@ -381,11 +1309,15 @@ class PyOrm(object):
         return collection.has_index()
 
     def dropCollection(self, collectionName, timeout):
+        self.searchCache.invalidate(collectionName)
+        self.loadState.forget(collectionName)
         collection = self.getTargetCollection(collectionName)
         collection.drop(timeout=timeout)
         return self.isCollectionExist(collectionName)
 
     def dropPartition(self, collectionName, partitionName, timeout):
+        self.searchCache.invalidate(collectionName)
+        self.loadState.forget(collectionName)
         collection = self.getTargetCollection(collectionName)
         collection.drop_partition(partitionName, timeout=timeout)
         return self.isPartitionExist(collection, partitionName)
@@ -395,10 +1327,35 @@ class PyOrm(object):
         collection.drop_index(timeout=timeout)
         return self.isIndexExist(collection)
 
-    def search(self, collectionName, searchParameters, prettierFormat=True):
-        collection = self.getTargetCollection(collectionName)
-        collection.load()
-        res = collection.search(**searchParameters)
+    def search(
+        self,
+        collectionName,
+        searchParameters,
+        prettierFormat=True,
+        failFast=False,
+        useCache=True,
+    ):
+        cache = self.searchCache
+        key = None
+        if cache.enabled and useCache:
+            key = cache.makeKey(collectionName, searchParameters)
+        res = cache.get(key) if key else None
+        if res is None:
+            partitionNames = searchParameters.get("partition_names")
+            collection = self.getLoadedCollection(
+                collectionName, partitionNames, failFast
+            )
+            try:
+                res = collection.search(**searchParameters)
+            except Exception as e:
+                # It may be released by others, check the load state next time.
+                self.loadState.forget(collectionName)
+                raise e
+            if key:
+                res = [
+                    [SearchHit(x.id, x.distance, x.score) for x in hits] for hits in res
+                ]
+                cache.put(key, res)
         if not prettierFormat:
             return res
         # hits = res[0]
@@ -415,10 +1372,190 @@ class PyOrm(object):
         # return tabulate(map(lambda x: [x.id, x.distance], hits), headers=['Index', 'ID', 'Distance'], tablefmt='grid', showindex=True)
         return results
 
-    def query(self, collectionName, queryParameters):
+    def searchInBatches(
+        self,
+        collectionName,
+        queries,
+        searchParameters,
+        writer,
+        workers=1,
+        failFast=False,
+    ):
+        """
+        Search chunks of query vectors yielded by Fs.readQueryVectorsInBatches
+        with `workers` threads, each with its own connection if it is greater
+        than 1, and hand the results to `writer`(see Fs.SearchResultWriter).
+        """
+        from threading import Lock
+
+        partitionNames = searchParameters.get("partition_names")
+        self.ensureLoaded(collectionName, partitionNames, failFast=failFast)
+        aliases = self.connectWorkerAliases(workers) if workers > 1 else [None]
+        targets = {}
+        summary = {"queries": 0, "requests": 0}
+        lock = Lock()
+        startTime = time()
+
+        def searchChunk(chunk, workerIndex):
+            begin, vectors = chunk
+            if workerIndex not in targets:
+                targets[workerIndex] = self.getTargetCollection(
+                    collectionName, aliases[workerIndex]
+                )
+            data = vectors.tolist() if hasattr(vectors, "tolist") else vectors
+            results = targets[workerIndex].search(data, **searchParameters)
+            with lock:
+                writer.write(begin, results)
+                summary["queries"] += len(data)
+                summary["requests"] += 1
+
+        try:
+            runPipeline(queries, searchChunk, workers, workers)
+        finally:
+            if workers > 1:
+                self.disconnectWorkerAliases(aliases)
+        seconds = time() - startTime
+        return tabulate(
+            [
+                ["Total queries: ", summary["queries"]],
+                ["Search requests: ", summary["requests"]],
+                ["Seconds: ", round(seconds, 3)],
+                ["Queries/s: ", round(summary["queries"] / (seconds or 1e-9), 1)],
+            ]
+        )
+
+    def searchIds(self, collectionName, chunks, searchParameters, failFast=False):
+        "Search `chunks` of query vectors one by one and return the ids of hits."
+        resultIds = []
+        for data in chunks:
+            results = self.search(
+                collectionName,
+                dict(searchParameters, data=data),
+                prettierFormat=False,
+                failFast=failFast,
+                useCache=False,
+            )
+            resultIds += [[hit.id for hit in hits] for hits in results]
+        return resultIds
+
+    def benchSearch(
+        self,
+        collectionName,
+        chunks,
+        searchParameters,
+        concurrency=1,
+        duration=DefaultBenchDuration,
+        rate=None,
+        failFast=False,
+        settings=None,
+    ):
+        """
+        Search `chunks` of query vectors round robin with `concurrency`
+        threads for `duration` seconds, bypassing the search cache, and
+        return a SearchBenchmark. Without `rate` the load is closed-loop, a
+        thread sends its next request once the last one returns. With `rate`
+        requests/s, requests are sent on a fixed schedule and latencies count
+        from the scheduled time, so a server falling behind isn't hidden.
+        Every thread gets its Collection before the benchmark starts, so only
+        search RPCs are timed.
+        """
+        from threading import Lock, Thread
+        from time import perf_counter, sleep
+
+        partitionNames = searchParameters.get("partition_names")
+        self.ensureLoaded(collectionName, partitionNames, failFast=failFast)
+        targets = [self.getTargetCollection(collectionName) for i in range(concurrency)]
+        benchmark = SearchBenchmark(concurrency, rate, settings)
+        sequence = {"next": 0}
+        lock = Lock()
+        startTime = benchmark.startTime
+        endTime = startTime + duration
+
+        def work(collection):
+            while True:
+                with lock:
+                    index = sequence["next"]
+                    sequence["next"] += 1
+                scheduledTime = startTime + index / rate if rate else perf_counter()
+                if scheduledTime >= endTime:
+                    return
+                sleep(max(scheduledTime - perf_counter(), 0))
+                data = chunks[index % len(chunks)]
+                try:
+                    collection.search(data, **searchParameters)
+                except Exception as e:
+                    benchmark.record(None, len(data), e)
+                else:
+                    benchmark.record(perf_counter() - scheduledTime, len(data))
+
+        threads = [Thread(target=work, args=[x], daemon=True) for x in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return benchmark.stop()
+
+    def sweepSearchParam(
+        self,
+        collectionName,
+        chunks,
+        searchParameters,
+        paramName,
+        values,
+        groundTruth,
+        concurrency=1,
+        duration=DefaultTuneDuration,
+        failFast=False,
+    ):
+        """
+        Measure recall against `groundTruth`(see computeGroundTruth) and QPS
+        (see benchSearch) of searches with each of `values` of the search
+        parameter `paramName`, return a point of them for every value.
+        """
+        from copy import deepcopy
+        import click
+
+        limit = searchParameters["limit"]
+        benchChunks = [chunk for chunk in chunks if len(chunk) == len(chunks[0])]
+        points = []
+        for value in values:
+            parameters = deepcopy(searchParameters)
+            parameters["param"].setdefault("params", {})[paramName] = value
+            click.echo(f"Measuring {paramName}={value}...")
+            resultIds = self.searchIds(collectionName, chunks, parameters, failFast)
+            recall = RecallReport(resultIds, groundTruth, limit).mean()
+            benchmark = self.benchSearch(
+                collectionName,
+                benchChunks,
+                parameters,
+                concurrency,
+                duration,
+                failFast=failFast,
+            ).toDict()
+            points.append(
+                {
+                    paramName: value,
+                    "recall": round(recall, 4),
+                    "qps": benchmark["queries_per_second"],
+                    "p99_ms": benchmark["latency_ms"]["p99"],
+                    "errors": benchmark["errors"],
+                }
+            )
+        return points
+
+    def query(
+        self, collectionName, queryParameters, failFast=False, prettierFormat=True
+    ):
         collection = self.getTargetCollection(collectionName)
-        collection.load()
-        res = collection.query(**queryParameters)
+        partitionNames = queryParameters.get("partition_names")
+        self.ensureLoaded(collectionName, partitionNames, collection, failFast)
+        try:
+            res = collection.query(**queryParameters)
+        except Exception as e:
+            self.loadState.forget(collectionName)
+            raise e
+        if not prettierFormat:
+            return res
         # return f"- Query results: {res}"
         if not len(res):
             return f"- Query results: {res}"
@@ -430,23 +1567,572 @@ class PyOrm(object):
             showindex=True,
         )
 
-    def insert(self, collectionName, data, partitionName=None, timeout=None):
+    def queryInPages(
+        self,
+        collectionName,
+        queryParameters,
+        pageSize=DefaultQueryPageSize,
+        maxRows=None,
+        failFast=False,
+    ):
+        """
+        Yield the results of a query page by page in primary key order, at
+        most `maxRows` rows. Query has no limit, so primary keys are walked in
+        pages of at most `pageSize` entities(see queryPrimaryKeyRanges), each
+        queried as `<page> && (<expr>)` only when the last page has been
+        consumed.
+        """
         collection = self.getTargetCollection(collectionName)
-        result = collection.insert(data, partition_name=partitionName, timeout=timeout)
-        entitiesNum = collection.num_entities
-        return [result, entitiesNum]
+        partitionNames = queryParameters.get("partition_names")
+        self.ensureLoaded(collectionName, partitionNames, collection, failFast)
+        fields = self.getImportFields(collectionName)
+        pkName = next(filter(lambda x: x["primary"], fields))["name"]
+        indexDetails = self._list_index(collectionName)
+        vectorField = getIndexedVectorField(fields, indexDetails)
+        timeout = queryParameters.get("timeout")
+        sample, rowCount = [], 0
+        for partitionName in partitionNames or [None]:
+            target = collection
+            if partitionName:
+                target = collection.partition(partitionName)
+                if target is None:
+                    raise ParameterException(
+                        f"Partition {partitionName} doesn't exist!"
+                    )
+            rowCount += self.countEntities(collectionName, partitionName)
+            sample += self.samplePrimaryKeys(
+                collection, partitionName, vectorField, indexDetails, timeout
+            )
+        outputFields = queryParameters.get("output_fields")
+        if outputFields and pkName not in outputFields:
+            outputFields = [pkName] + outputFields
+        rows = 0
+        for page in self.queryPrimaryKeyRanges(
+            collection,
+            pkName,
+            sample,
+            rowCount,
+            pageSize,
+            dict(queryParameters, output_fields=outputFields),
+        ):
+            page.sort(key=lambda x: x[pkName])
+            if maxRows is not None:
+                page = page[: maxRows - rows]
+            rows += len(page)
+            if page:
+                yield page
+            if maxRows is not None and rows >= maxRows:
+                return
+
+    def queryPrimaryKeyRanges(
+        self, collection, pkName, sample, rowCount, pageSize, queryParameters
+    ):
+        """
+        Yield the results of `queryParameters`(arguments of Collection.query)
+        page by page in primary key ranges, see getPrimaryKeyRangeExprs. The
+        sample may leave ranges far larger than `pageSize`, so only primary
+        keys of a range are queried first, and it is queried in pages of at
+        most `pageSize` entities cut at them.
+        """
+        expr = queryParameters.get("expr")
+
+        def withExpr(rangeExpr):
+            return f"{rangeExpr} && ({expr})" if expr else rangeExpr
+
+        for rangeExpr in getPrimaryKeyRangeExprs(pkName, sample, rowCount, pageSize):
+            pks = collection.query(
+                **dict(
+                    queryParameters, expr=withExpr(rangeExpr), output_fields=[pkName]
+                )
+            )
+            pks = [x[pkName] for x in pks]
+            for pageExpr in splitPrimaryKeys(pkName, pks, pageSize):
+                yield collection.query(**dict(queryParameters, expr=withExpr(pageExpr)))
+
+    def getImportFields(self, collectionName):
+        """
+        Return the fields of a collection as dicts for the decoding and checks
+        of Fs.readFileInBatches and Fs.alignBatchesToFields:
+
+            {"name": "vector", "type": "FLOAT_VECTOR", "dim": 128, "autoId": False, "primary": False}
+        """
+        schema = self.getTargetCollection(collectionName).schema
+        return [
+            {
+                "name": field.name,
+                "type": DataTypeByNum[field.dtype],
+                "dim": int(field.params.get("dim", 0)),
+                "autoId": bool(field.is_primary and schema.auto_id),
+                "primary": bool(field.is_primary),
+            }
+            for field in schema.fields
+        ]
+
+    def insert(
+        self,
+        collectionName,
+        data,
+        partitionName=None,
+        timeout=None,
+        alias=None,
+        chunking=None,
+        countEntities=True,
+        retries=0,
+        pkName=None,
+        pkIndex=None,
+        batchId="batch",
+    ):
+        """
+        Insert columns of `data`. With `chunking` like {"rows": 1000}, they
+        are split into inserts of at most chunking["rows"] rows, which is
+        halved whenever the server rejects a message as too large. Reading
+        the number of entities flushes the collection, it is None unless
+        `countEntities`. See insertWithRetry for the other arguments.
+        """
+        import click
+
+        self.searchCache.invalidate(collectionName)
+        collection = self.getTargetCollection(collectionName, alias)
+        retryArgs = [retries, pkName, pkIndex]
+        if not chunking:
+            result = self.insertWithRetry(
+                collection, data, partitionName, timeout, *retryArgs, batchId
+            )
+            return [result, collection.num_entities if countEntities else None]
+        rowCount = len(data[0]) if data else 0
+        results, begin = [], 0
+        while begin < rowCount:
+            end = min(begin + chunking["rows"], rowCount)
+            chunk = [column[begin:end] for column in data]
+            chunkId = f"{batchId}[{begin}:{end}]"
+            try:
+                results.append(
+                    self.insertWithRetry(
+                        collection, chunk, partitionName, timeout, *retryArgs, chunkId
+                    )
+                )
+            except Exception as e:
+                if end - begin <= 1 or not isMessageSizeError(e):
+                    raise
+                chunking["rows"] = min(chunking["rows"], (end - begin) // 2)
+                click.echo(
+                    f"Insert of {end - begin} rows is too large, retrying with {chunking['rows']} rows."
+                )
+                continue
+            begin = end
+        entitiesNum = collection.num_entities if countEntities else None
+        return [mergeInsertResults(results), entitiesNum]
+
+    def insertWithRetry(
+        self,
+        collection,
+        data,
+        partitionName=None,
+        timeout=None,
+        retries=0,
+        pkName=None,
+        pkIndex=None,
+        batchId="batch",
+    ):
+        """
+        Insert columns of `data`, retrying up to `retries` times on transient
+        errors after a jittered exponential backoff. A failed insert may still
+        have been applied, so before sending `data` again the primary keys in
+        column `pkIndex` are queried and rows already inserted are left out.
+        The insert isn't retried if that can't be checked: without `pkName`
+        (auto id) or if the query fails, for example since the collection has
+        been released, see checkInsertRetries to tell it before inserting.
+        Query doesn't wait for the failed insert to be visible, so rows of it
+        not visible yet are still sent again.
+        """
+        import click
+        from time import sleep
+
+        applied, attempt = [], 0
+        while True:
+            try:
+                result = collection.insert(
+                    list(map(formatColumnForInsert, data)),
+                    partition_name=partitionName,
+                    timeout=timeout,
+                )
+                return mergeInsertResults(applied + [result])
+            except Exception as e:
+                if attempt >= retries or not isTransientError(e):
+                    raise
+                if pkName is None:
+                    raise ParameterException(
+                        f"Insert of {batchId} failed: {str(e).strip()}\nIt is not retried, primary keys are generated by Milvus so the rows already inserted can't be told."
+                    )
+                attempt += 1
+                backoff = getRetryBackoff(attempt)
+                click.echo(
+                    f"Insert of {batchId} failed: {str(e).strip()}\nRetry {attempt}/{retries} in {round(backoff, 2)} seconds..."
+                )
+                sleep(backoff)
+            try:
+                data, inserted = self.dropInsertedRows(
+                    collection, data, pkName, pkIndex, partitionName, timeout
+                )
+            except Exception as e:
+                raise ParameterException(
+                    f"Insert of {batchId} is not retried, the rows already inserted could not be checked: {str(e).strip()}"
+                )
+            if inserted.insert_count:
+                click.echo(
+                    f"{inserted.insert_count} rows of {batchId} were inserted before, they are not sent again."
+                )
+                applied.append(inserted)
+            if not len(data[pkIndex]):
+                return mergeInsertResults(applied)
+
+    def checkInsertRetries(self, collectionName, partitionName=None, pkName=None):
+        """
+        Return why failed inserts into a collection(or one of its partitions)
+        can't be retried by insertWithRetry, or None if they can. The rows
+        already inserted are told by querying the primary key `pkName`, which
+        needs it not to be auto id and the collection to be loaded. The
+        loading_progress of an empty collection tells nothing, it is queried.
+        """
+        from pymilvus import loading_progress
+
+        if pkName is None:
+            return "the primary key is auto id, the rows already inserted can't be told"
+        partitionNames = [partitionName] if partitionName else None
+        if self.loadState.isLoaded(collectionName, partitionNames):
+            return None
+        try:
+            progress = loading_progress(collectionName, partitionNames, self.alias)
+            loaded = progress.get("num_loaded_entities")
+            total = progress.get("num_total_entities")
+            if total == 0:
+                self.getTargetCollection(collectionName).query(
+                    f"{pkName} in [0]",
+                    output_fields=[pkName],
+                    partition_names=partitionNames,
+                )
+                loaded = total = 1
+        except Exception as e:
+            loaded, total = 0, None
+        if not (total and loaded >= total):
+            return f"{collectionName} is not loaded, load it first to query the rows already inserted"
+        return None
+
+    def dropInsertedRows(
+        self, collection, data, pkName, pkIndex, partitionName=None, timeout=None
+    ):
+        """
+        Return the rows of `data` whose primary keys are not in the collection
+        and an insert result of the others. The collection should be loaded.
+        """
+        from types import SimpleNamespace
+
+        pks = [int(pk) for pk in data[pkIndex]]
+        existing = set()
+        for begin in range(0, len(pks), DefaultExportPageSize):
+            res = collection.query(
+                f"{pkName} in {pks[begin:begin + DefaultExportPageSize]}",
+                output_fields=[pkName],
+                partition_names=[partitionName] if partitionName else None,
+                timeout=timeout,
+            )
+            existing.update(map(lambda x: x[pkName], res))
+        indexes = [i for i, pk in enumerate(pks) if pk not in existing]
+        insertedPks = [pk for pk in pks if pk in existing]
+        inserted = SimpleNamespace(
+            insert_count=len(insertedPks), timestamp=0, primary_keys=insertedPks
+        )
+        return [takeRows(column, indexes) for column in data], inserted
 
     def importData(self, collectionName, data, partitionName=None, timeout=None):
-        [result, entitiesNum] = self.insert(
-            collectionName, data, partitionName, timeout
+        return self.importDataInBatches(
+            collectionName, [{"data": data}], partitionName, timeout
+        )
+
+    def importDataInBatches(
+        self,
+        collectionName,
+        batches,
+        partitionName=None,
+        timeout=None,
+        workers=1,
+        queueSize=DefaultImportQueueSize,
+        onInserted=None,
+        fields=None,
+        byteBudget=DefaultInsertByteBudget,
+        reportPath=None,
+        flushMode="end",
+        flushEvery=0,
+        retries=DefaultInsertRetries,
+    ):
+        """
+        Insert batches read by Fs.readCsvFileInBatches with `workers` threads,
+        `onInserted(batch)` is called after every successful insert. With the
+        `fields` of the collection, batches are split into inserts of about
+        `byteBudget` bytes estimated by estimateRowBytes. The ImportTelemetry
+        of the import is appended to the result and written to `reportPath`
+        as JSON if it is given.
+
+        Batches are inserted without flushing. The collection is flushed once
+        after the last batch if `flushMode` is "end", also after every
+        `flushEvery` batches if it is "every", and never if it is "never".
+
+        Inserts failed by transient errors are retried up to `retries` times,
+        see insertWithRetry. Rows are checked by the primary key of `fields`.
+        If checkInsertRetries says they can't be, retries are turned off with
+        a message before the first batch.
+        """
+        import click
+        from threading import Lock
+
+        summary = {"insert_count": 0, "timestamp": 0, "batches": 0}
+        aliases = self.connectWorkerAliases(workers) if workers > 1 else [None]
+        throughput = [[alias or self.alias, 0, 0, 0.0] for alias in aliases]
+        lock = Lock()
+        chunking = {"rows": 0} if fields else None
+        telemetry = ImportTelemetry()
+        insertFields = [field for field in fields or [] if not field["autoId"]]
+        pkIndex = next(
+            (i for i, field in enumerate(insertFields) if field["primary"]), None
         )
-        insert_count = result.insert_count
-        timestamp = result.timestamp
+        pkName = None if pkIndex is None else insertFields[pkIndex]["name"]
+        if retries:
+            reason = self.checkInsertRetries(collectionName, partitionName, pkName)
+            if reason:
+                click.echo(f"Failed inserts are not retried: {reason}.")
+                retries = 0
+
+        def insertBatch(batch, workerIndex):
+            startTime = time()
+            if chunking is not None:
+                with lock:
+                    if not chunking["rows"]:
+                        rowBytes = estimateRowBytes(fields, batch["data"])
+                        chunking["rows"] = max(byteBudget // max(rowBytes, 1), 1)
+            rpcStartTime = time()
+            [result, entitiesNum] = self.insert(
+                collectionName,
+                batch["data"],
+                partitionName,
+                timeout,
+                aliases[workerIndex],
+                chunking,
+                countEntities=False,
+                retries=retries,
+                pkName=pkName,
+                pkIndex=pkIndex,
+                batchId=f"batch {batch.get('id', 0)}",
+            )
+            telemetry.record(batch, time() - rpcStartTime)
+            if onInserted:
+                onInserted(batch)
+            workerThroughput = throughput[workerIndex]
+            workerThroughput[1] += 1
+            workerThroughput[2] += result.insert_count
+            workerThroughput[3] += time() - startTime
+            with lock:
+                summary["insert_count"] += result.insert_count
+                summary["timestamp"] = max(summary["timestamp"], result.timestamp)
+                summary["batches"] += 1
+                flushNow = flushMode == "every" and not summary["batches"] % flushEvery
+            if flushNow:
+                self.flushCollectionByNumEntities(collectionName, aliases[workerIndex])
+
+        try:
+            runPipeline(batches, insertBatch, workers, queueSize)
+        finally:
+            if workers > 1:
+                self.disconnectWorkerAliases(aliases)
+        telemetry.stop()
+        if reportPath:
+            telemetry.writeJson(reportPath)
+        insert_count, timestamp = summary["insert_count"], summary["timestamp"]
+        if flushMode == "never":
+            entitiesNum = "Not flushed"
+        else:
+            entitiesNum = self.flushCollectionByNumEntities(collectionName)
         prettierResult = []
         prettierResult.append(["Total insert entities: ", insert_count])
         prettierResult.append(["Total collection entities: ", entitiesNum])
         prettierResult.append(["Milvus timestamp: ", timestamp])
-        return tabulate(prettierResult)
+        result = f"{tabulate(prettierResult)}\n\n{telemetry.toTable()}"
+        if workers <= 1:
+            return result
+        workerResult = tabulate(
+            [
+                [alias, batchNum, rows, round(seconds, 3), round(rows / seconds, 1)]
+                for [alias, batchNum, rows, seconds] in throughput
+                if seconds
+            ],
+            headers=["Worker Alias", "Batches", "Rows", "Insert Seconds", "Rows/s"],
+            tablefmt="grid",
+        )
+        return f"{result}\n\n{workerResult}"
+
+    def exportData(
+        self,
+        collectionName,
+        writer,
+        fields,
+        partitionNames=None,
+        pageSize=DefaultExportPageSize,
+        workers=1,
+        timeout=None,
+    ):
+        """
+        Stream `fields` of the entities of a collection to `writer`(see
+        Fs.openExportWriter) page by page, nothing but a page per worker is
+        held in memory. Query has no limit, so every partition is queried in
+        primary key ranges of at most `pageSize` rows, see samplePrimaryKeys
+        and queryPrimaryKeyRanges. Partitions are exported by `workers`
+        threads in parallel.
+        """
+        from threading import Lock
+        import click
+
+        collection = self.getTargetCollection(collectionName)
+        self.ensureLoaded(collectionName, collection=collection)
+        schemaFields = self.getImportFields(collectionName)
+        pkName = next(filter(lambda x: x["primary"], schemaFields))["name"]
+        indexDetails = self._list_index(collectionName)
+        vectorField = getIndexedVectorField(schemaFields, indexDetails)
+        partitions = partitionNames or self._list_partition_names(collectionName)
+        names = [field["name"] for field in fields]
+        workers = max(min(workers, len(partitions)), 1)
+        aliases = self.connectWorkerAliases(workers) if workers > 1 else [None]
+        summary = {"rows": 0, "queries": 0}
+        lock = Lock()
+
+        def exportPartition(partitionName, workerIndex):
+            target = self.getTargetCollection(collectionName, aliases[workerIndex])
+            partition = target.partition(partitionName)
+            if partition is None:
+                raise ParameterException(f"Partition {partitionName} doesn't exist!")
+            rowCount = self.countEntities(collectionName, partitionName)
+            sample = self.samplePrimaryKeys(
+                target, partitionName, vectorField, indexDetails, timeout
+            )
+            partitionRows = 0
+            queryParameters = {
+                "output_fields": names,
+                "partition_names": [partitionName],
+                "timeout": timeout,
+            }
+            for page in self.queryPrimaryKeyRanges(
+                target, pkName, sample, rowCount, pageSize, queryParameters
+            ):
+                partitionRows += len(page)
+                with lock:
+                    writer.write(page)
+                    summary["rows"] += len(page)
+                    summary["queries"] += 1
+            click.echo(f"Partition {partitionName}: {partitionRows} rows exported.")
+
+        try:
+            runPipeline(partitions, exportPartition, workers, workers)
+        finally:
+            if workers > 1:
+                self.disconnectWorkerAliases(aliases)
+        return tabulate(
+            [
+                ["Total exported entities: ", summary["rows"]],
+                ["Range queries: ", summary["queries"]],
+                ["Partitions: ", len(partitions)],
+            ]
+        )
+
+    def countEntities(self, collectionName, partitionName=None):
+        """
+        Return the row count in the statistics of a collection(or one of its
+        partitions). Unlike num_entities it doesn't flush the collection, so
+        rows not flushed yet aren't counted.
+        """
+        from pymilvus import connections
+
+        conn = connections.get_connection(self.alias)
+        if partitionName:
+            stats = conn.get_partition_stats(collectionName, partitionName)
+        else:
+            stats = conn.get_collection_stats(collectionName)
+        return int(stats["row_count"])
+
+    def samplePrimaryKeys(
+        self,
+        collection,
+        partitionName,
+        vectorField,
+        indexDetails=None,
+        timeout=None,
+        sampleSize=DefaultExportSampleSize,
+        queries=DefaultExportSampleQueries,
+    ):
+        """
+        Return primary keys of entities of a partition(or the whole collection
+        if it is None), the up to `sampleSize` nearest neighbors of each of
+        `queries` random vectors. Primary keys hardly depend on vectors, so
+        they spread over the primary keys of the partition, but not evenly.
+        """
+        import numpy as np
+
+        dim = vectorField["dim"]
+        if vectorField["type"] == "BINARY_VECTOR":
+            vectors = [
+                np.random.randint(0, 256, dim // 8, dtype=np.uint8).tobytes()
+                for i in range(queries)
+            ]
+            param = {"metric_type": "HAMMING", "params": {}}
+        else:
+            vectors = np.random.random((queries, dim)).astype(np.float32).tolist()
+            param = {"metric_type": "L2", "params": {}}
+        if indexDetails:
+            searchParams = {
+                "nprobe": max(indexDetails["params"].get("nlist", 1) // 8, 1),
+                "ef": sampleSize,
+                "search_k": -1,
+                "search_length": 300,
+            }
+            param = {
+                "metric_type": indexDetails["metric_type"],
+                "params": {
+                    name: searchParams[name]
+                    for name in getIndexSearchParams(indexDetails["index_type"])
+                    if name in searchParams
+                },
+            }
+        results = collection.search(
+            vectors,
+            vectorField["name"],
+            param,
+            sampleSize,
+            partition_names=[partitionName] if partitionName else None,
+            timeout=timeout,
+        )
+        return list({hit.id for hits in results for hit in hits})
+
+    def connectWorkerAliases(self, workers):
+        """
+        Open one more connection to the server of the current alias for each
+        worker, so concurrent inserts don't share a single gRPC channel.
+        """
+        from pymilvus import connections
+
+        addr = connections.get_connection_addr(self.alias)
+        aliases = []
+        try:
+            for i in range(workers):
+                alias = f"{self.alias}_worker_{i}"
+                connections.connect(alias, host=addr["host"], port=addr["port"])
+                aliases.append(alias)
+        except Exception as e:
+            self.disconnectWorkerAliases(aliases)
+            raise ConnectException(f"Connect worker {i} to Milvus error!{str(e)}")
+        return aliases
+
+    def disconnectWorkerAliases(self, aliases):
+        from pymilvus import connections
+
+        for alias in aliases:
+            connections.disconnect(alias)
 
     def calcDistance(self, vectors_left, vectors_right, params=None, timeout=None):
         from pymilvus import utility
@@ -457,6 +2143,7 @@ class PyOrm(object):
         return result
 
     def deleteEntities(self, expr, collectionName, partition_name=None, timeout=None):
+        self.searchCache.invalidate(collectionName)
         collection = self.getTargetCollection(collectionName)
         result = collection.delete(expr, partition_name=partition_name, timeout=timeout)
         return result
@@ -470,7 +2157,7 @@ class PyOrm(object):
         if not prettierFormat or not result:
             return result
         firstChild = result[0]
-        headers = ["segmentID", "collectionID", "partitionID", "mem_size", "num_rows"]
+        headers = QuerySegmentInfoFields
         return tabulate(
             [[getattr(_, i) for i in headers] for _ in result],
             headers=headers,
@@ -522,6 +2209,8 @@ class Completer(object):
     #         'list', 'load', 'query', 'release', 'search', 'show', 'version' ]
     RE_SPACE = re.compile(".*\s+$", re.M)
     CMDS_DICT = {
+        "bench": ["recall", "search"],
+        "cache": [],
         "calc": [],
         "clear": [],
         "connect": [],
@@ -529,6 +2218,7 @@ class Completer(object):
         "delete": ["alias", "collection", "partition", "index"],
         "describe": ["collection", "partition", "index"],
         "exit": [],
+        "export": [],
         "help": [],
         "import": [],
         "list": ["collections", "partitions", "indexes"],
@@ -537,6 +2227,7 @@ class Completer(object):
         "release": [],
         "search": [],
         "show": ["connection", "index_progress", "loading_progress", "query_segment"],
+        "tune": [],
         "version": [],
     }
 
@@ -556,7 +2247,7 @@ class Completer(object):
             f"Completions for the {cmd} command."
             if not args:
                 return self._complete_path(".")
-            if len(args) <= 1 and not cmd == "import":
+            if len(args) <= 1 and cmd not in ["import", "export"]:
                 return self._complete_2nd_level(sub_cmds, args[-1])
             return self._complete_path(args[-1])
 
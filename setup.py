@@ -20,7 +20,12 @@ setup(
         "pymilvus==2.0.0rc8",
         "tabulate==0.8.9",
         "requests==2.26.0",
+        "numpy",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "zstd": ["zstandard>=0.22"],
+    },
     entry_points={
         "console_scripts": [
             "milvus_cli = milvus_cli.scripts.milvus_cli:runCliPrompt",
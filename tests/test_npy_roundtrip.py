@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "milvus_cli"))
+
+from Fs import openExportWriter, readFileInBatches, alignBatchesToFields
+from Types import ParameterException
+
+Fields = [
+    {"name": "id", "type": "INT64", "dim": None, "autoId": False, "primary": True},
+    {
+        "name": "vector",
+        "type": "FLOAT_VECTOR",
+        "dim": 4,
+        "autoId": False,
+        "primary": False,
+    },
+    {"name": "color", "type": "INT64", "dim": None, "autoId": False, "primary": False},
+]
+
+
+def exportRows(path, rows):
+    writer = openExportWriter(str(path), Fields)
+    writer.write(rows)
+    writer.close()
+
+
+def importColumns(path, fields=Fields, sidecar=None):
+    batches = readFileInBatches(str(path), 2, sidecar=sidecar, fields=fields)
+    batches = list(alignBatchesToFields(batches, fields))
+    return [
+        np.concatenate([np.asarray(batch["data"][i]) for batch in batches])
+        for i in range(len(fields))
+    ]
+
+
+def test_npy_export_is_imported_back(tmp_path):
+    rows = [
+        {"id": i, "vector": [i + 0.5, 1.0, 2.0, 3.0], "color": i * 10} for i in range(5)
+    ]
+    exportRows(tmp_path / "car.npy", rows)
+    ids, vectors, colors = importColumns(
+        tmp_path / "car.npy", sidecar=str(tmp_path / "car.csv")
+    )
+    assert ids.tolist() == [row["id"] for row in rows]
+    assert vectors.tolist() == [row["vector"] for row in rows]
+    assert colors.tolist() == [row["color"] for row in rows]
+
+
+def test_unmatched_columns_are_rejected(tmp_path):
+    np.save(tmp_path / "vector.npy", np.zeros((3, 4), dtype=np.float32))
+    with open(tmp_path / "sidecar.csv", "w") as sidecar_file:
+        sidecar_file.write("color,id\n1,1\n2,2\n3,3\n")
+    fields = [dict(field, name=f"_{field['name']}") for field in Fields]
+    with pytest.raises(ParameterException):
+        importColumns(tmp_path / "vector.npy", fields, str(tmp_path / "sidecar.csv"))
+
+
+def test_scalar_column_of_vector_field_is_rejected(tmp_path):
+    np.savez(
+        tmp_path / "columns.npz",
+        id=np.arange(3),
+        vector=np.zeros(3),
+        color=np.arange(3),
+    )
+    with pytest.raises(ParameterException):
+        importColumns(tmp_path / "columns.npz")